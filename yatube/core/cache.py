@@ -0,0 +1,288 @@
+"""Общий для всех процессов кеш в файле SQLite.
+
+Каждый воркер открывает тот же файл, поэтому прогретый кеш и сброс
+поколений лент видны всем сразу. Устаревшие записи ещё STALE_TIMEOUT
+секунд хранятся как запасные: когда горячий ключ истёк, пересчитывать
+его идёт только тот процесс, что первым взял блокировку, а остальные
+до записи нового значения получают старое.
+
+    CACHES = {
+        'default': {
+            'BACKEND': 'core.cache.SQLiteCache',
+            'LOCATION': '/var/tmp/yatube-cache.sqlite3',
+            'OPTIONS': {'STALE_TIMEOUT': 300, 'LOCK_TIMEOUT': 30},
+        }
+    }
+"""
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS cache ('
+    'key TEXT PRIMARY KEY, value BLOB NOT NULL, expires REAL)',
+    'CREATE INDEX IF NOT EXISTS cache_expires ON cache (expires)',
+    'CREATE TABLE IF NOT EXISTS cache_lock ('
+    'key TEXT PRIMARY KEY, expires REAL NOT NULL)',
+)
+CULL_EVERY = 100
+# Старые сборки SQLite принимают не больше 999 параметров в запросе.
+MAX_VARIABLES = 500
+
+
+class SQLiteCache(BaseCache):
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get('OPTIONS', {})
+        self.path = location
+        self.stale_timeout = options.get('STALE_TIMEOUT', 300)
+        self.lock_timeout = options.get('LOCK_TIMEOUT', 30)
+        self.poll_interval = options.get('POLL_INTERVAL', 0.05)
+        self._local = threading.local()
+
+    @property
+    def db(self):
+        # Соединение своё у каждого потока и каждого процесса после fork.
+        local = self._local
+        if getattr(local, 'pid', None) != os.getpid():
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            local.connection = sqlite3.connect(
+                self.path, timeout=self.lock_timeout, isolation_level=None)
+            local.connection.execute('PRAGMA journal_mode=WAL')
+            local.connection.execute('PRAGMA synchronous=NORMAL')
+            for statement in SCHEMA:
+                local.connection.execute(statement)
+            local.pid = os.getpid()
+            local.sets = 0
+        return local.connection
+
+    @contextmanager
+    def transaction(self):
+        db = self.db
+        db.execute('BEGIN IMMEDIATE')
+        try:
+            yield db
+        except BaseException:
+            db.execute('ROLLBACK')
+            raise
+        db.execute('COMMIT')
+
+    def _key(self, key, version):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        return key
+
+    def _expires(self, timeout):
+        # get_backend_timeout отдаёт абсолютное время истечения.
+        return self.get_backend_timeout(timeout)
+
+    def _read(self, db, key):
+        """(значение, свежее ли оно) или (None, False), если записи нет."""
+        row = db.execute(
+            'SELECT value, expires FROM cache WHERE key = ?', (key,)
+        ).fetchone()
+        if row is None:
+            return None, False
+        return self._unpack(*row)
+
+    def _read_many(self, db, keys):
+        """{ключ: (значение, свежее ли оно)} одним запросом на пачку."""
+        found = {}
+        for start in range(0, len(keys), MAX_VARIABLES):
+            chunk = keys[start:start + MAX_VARIABLES]
+            rows = db.execute(
+                'SELECT key, value, expires FROM cache WHERE key IN ({})'
+                .format(', '.join('?' * len(chunk))), chunk
+            )
+            for key, value, expires in rows:
+                found[key] = self._unpack(value, expires)
+        return found
+
+    def _unpack(self, value, expires):
+        now = time.time()
+        if expires is None or expires > now:
+            return pickle.loads(value), True
+        if now - expires > self.stale_timeout:
+            return None, False
+        return pickle.loads(value), False
+
+    def _acquire(self, key):
+        db = self.db
+        now = time.time()
+        db.execute('DELETE FROM cache_lock WHERE key = ? AND expires < ?',
+                   (key, now))
+        cursor = db.execute(
+            'INSERT OR IGNORE INTO cache_lock (key, expires) VALUES (?, ?)',
+            (key, now + self.lock_timeout)
+        )
+        return cursor.rowcount == 1
+
+    def _is_locked(self, key):
+        return self.db.execute(
+            'SELECT 1 FROM cache_lock WHERE key = ? AND expires >= ?',
+            (key, time.time())
+        ).fetchone() is not None
+
+    def _release(self, key):
+        self.db.execute('DELETE FROM cache_lock WHERE key = ?', (key,))
+
+    def _get(self, key, default):
+        return self._resolve(key, *self._read(self.db, key), default)
+
+    def _resolve(self, key, value, fresh, default):
+        if fresh:
+            return value
+        if value is None or self._acquire(key):
+            # Пересчитывать будет вызывающий: его set() снимет блокировку.
+            return default
+        return value
+
+    def get(self, key, default=None, version=None):
+        return self._get(self._key(key, version), default)
+
+    def get_many(self, keys, version=None):
+        made_keys = {self._key(key, version): key for key in keys}
+        rows = self._read_many(self.db, list(made_keys))
+        found = {}
+        for made_key, key in made_keys.items():
+            value, fresh = rows.get(made_key, (None, False))
+            value = self._resolve(made_key, value, fresh, None)
+            if value is not None:
+                found[key] = value
+        return found
+
+    def get_or_set(self, key, default, timeout=DEFAULT_TIMEOUT, version=None):
+        made_key = self._key(key, version)
+        value, fresh = self._read(self.db, made_key)
+        if fresh:
+            return value
+        if not self._acquire(made_key):
+            if value is not None:
+                return value
+            # Значения нет совсем: ждём того, кто его уже считает.
+            deadline = time.monotonic() + self.lock_timeout
+            while time.monotonic() < deadline:
+                time.sleep(self.poll_interval)
+                value, fresh = self._read(self.db, made_key)
+                if fresh:
+                    return value
+                if not self._is_locked(made_key):
+                    break
+        try:
+            value = default() if callable(default) else default
+        except BaseException:
+            self._release(made_key)
+            raise
+        if value is None:
+            self._release(made_key)
+        else:
+            self.set(key, value, timeout, version)
+        return value
+
+    def _set(self, db, key, value, timeout):
+        db.execute('DELETE FROM cache_lock WHERE key = ?', (key,))
+        expires = self._expires(timeout)
+        if expires is not None and expires <= time.time():
+            # Нулевой и отрицательный таймаут значат «не кешировать».
+            db.execute('DELETE FROM cache WHERE key = ?', (key,))
+            return
+        db.execute(
+            'INSERT OR REPLACE INTO cache (key, value, expires) '
+            'VALUES (?, ?, ?)',
+            (key, pickle.dumps(value, pickle.HIGHEST_PROTOCOL), expires)
+        )
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self._key(key, version)
+        with self.transaction() as db:
+            self._set(db, key, value, timeout)
+        self._maybe_cull()
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        with self.transaction() as db:
+            for key, value in data.items():
+                self._set(db, self._key(key, version), value, timeout)
+        self._maybe_cull()
+        return []
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self._key(key, version)
+        with self.transaction() as db:
+            if self._read(db, key)[1]:
+                return False
+            self._set(db, key, value, timeout)
+        return True
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self._key(key, version)
+        cursor = self.db.execute(
+            'UPDATE cache SET expires = ? '
+            'WHERE key = ? AND (expires IS NULL OR expires > ?)',
+            (self._expires(timeout), key, time.time())
+        )
+        return cursor.rowcount == 1
+
+    def incr(self, key, delta=1, version=None):
+        made_key = self._key(key, version)
+        with self.transaction() as db:
+            value, fresh = self._read(db, made_key)
+            if not fresh:
+                raise ValueError("Key '%s' not found" % key)
+            value += delta
+            db.execute(
+                'UPDATE cache SET value = ? WHERE key = ?',
+                (pickle.dumps(value, pickle.HIGHEST_PROTOCOL), made_key)
+            )
+        return value
+
+    def has_key(self, key, version=None):
+        return self._read(self.db, self._key(key, version))[1]
+
+    def delete(self, key, version=None):
+        key = self._key(key, version)
+        with self.transaction() as db:
+            cursor = db.execute('DELETE FROM cache WHERE key = ?', (key,))
+            db.execute('DELETE FROM cache_lock WHERE key = ?', (key,))
+        return cursor.rowcount == 1
+
+    def delete_many(self, keys, version=None):
+        for key in keys:
+            self.delete(key, version)
+
+    def clear(self):
+        with self.transaction() as db:
+            db.execute('DELETE FROM cache')
+            db.execute('DELETE FROM cache_lock')
+
+    def _maybe_cull(self):
+        # Подсчёт строк дорогой, поэтому проверяем не на каждую запись.
+        self._local.sets += 1
+        if self._local.sets % CULL_EVERY:
+            return
+        self.cull()
+
+    def cull(self):
+        with self.transaction() as db:
+            db.execute('DELETE FROM cache WHERE expires < ?',
+                       (time.time() - self.stale_timeout,))
+            db.execute('DELETE FROM cache_lock WHERE expires < ?',
+                       (time.time(),))
+            count = db.execute('SELECT count(*) FROM cache').fetchone()[0]
+            if count > self._max_entries and not self._cull_frequency:
+                db.execute('DELETE FROM cache')
+            elif count > self._max_entries:
+                # Вытесняем ближайшие к истечению, как и встроенные бэкенды
+                # вытесняют долю записей при переполнении.
+                db.execute(
+                    'DELETE FROM cache WHERE key IN (SELECT key FROM cache '
+                    'ORDER BY expires IS NULL, expires LIMIT ?)',
+                    (count // self._cull_frequency,)
+                )
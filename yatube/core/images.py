@@ -0,0 +1,99 @@
+"""Приём загруженных картинок.
+
+Загрузка проверяется до декодирования пикселей: размер файла и размеры
+из заголовка, который читается по кускам через ImageFile.Parser. JPEG
+декодируется сразу в уменьшенном масштабе (draft), картинка
+поворачивается по EXIF, ужимается до IMAGE_MAX_SIZE и перекодируется без
+метаданных. Так в MEDIA_ROOT не попадают исходники с камеры, а миниатюры
+потом режутся из небольшого файла.
+"""
+import os
+from io import BytesIO
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.template.defaultfilters import filesizeformat
+from PIL import Image, ImageFile, ImageOps
+
+CHUNK_SIZE = 64 * 1024
+SAVE_OPTIONS = {
+    'JPEG': {'quality': 85, 'optimize': True, 'progressive': True},
+    'PNG': {'optimize': True},
+}
+EXTENSIONS = {'JPEG': 'jpg', 'PNG': 'png'}
+SAVE_MODES = {
+    'JPEG': ('RGB', 'L'),
+    'PNG': ('1', 'L', 'LA', 'P', 'RGB', 'RGBA', 'I'),
+}
+
+
+def read_size(file_):
+    """(ширина, высота) из заголовка; дальше заголовка файл не читается."""
+    parser = ImageFile.Parser()
+    file_.seek(0)
+    try:
+        for chunk in file_.chunks(CHUNK_SIZE):
+            parser.feed(chunk)
+            if parser.image is not None:
+                return parser.image.size
+    except (OSError, Image.DecompressionBombError):
+        pass
+    raise ValidationError('Не удалось прочитать картинку.', code='invalid')
+
+
+def check(file_):
+    if file_.size > settings.IMAGE_MAX_UPLOAD_SIZE:
+        raise ValidationError(
+            'Файл больше %(limit)s.', code='too_large',
+            params={'limit': filesizeformat(settings.IMAGE_MAX_UPLOAD_SIZE)})
+    width, height = read_size(file_)
+    if width * height > settings.IMAGE_MAX_PIXELS:
+        raise ValidationError(
+            'Картинка %(width)s×%(height)s слишком большая.',
+            code='too_many_pixels',
+            params={'width': width, 'height': height})
+
+
+def is_lossless(image):
+    """Прозрачность и палитра: такие картинки не переводятся в JPEG."""
+    return (image.mode in ('1', 'P', 'RGBA', 'LA', 'PA')
+            or 'transparency' in image.info)
+
+
+def encode(image, image_format):
+    """Уменьшенная копия картинки в image_format: байты файла."""
+    limit = settings.IMAGE_MAX_SIZE
+    image.draft('RGB', (limit, limit))
+    image = ImageOps.exif_transpose(image)
+    image.thumbnail((limit, limit), Image.LANCZOS)
+    if image.mode not in SAVE_MODES[image_format]:
+        image = image.convert('RGB' if image_format == 'JPEG' else 'RGBA')
+    buffer = BytesIO()
+    # Без exif=... метаданные в новый файл не попадают.
+    image.save(buffer, image_format, **SAVE_OPTIONS[image_format])
+    return buffer.getvalue()
+
+
+def ingest(file_):
+    """Проверенная, уменьшенная и перекодированная копия загрузки."""
+    check(file_)
+    file_.seek(0)
+    try:
+        image = Image.open(file_)
+        if getattr(image, 'is_animated', False):
+            # Анимацию перекодирование сломало бы: хранится как есть.
+            file_.seek(0)
+            return file_
+        image_format = image.format
+        if image_format not in SAVE_OPTIONS:
+            image_format = 'PNG' if is_lossless(image) else 'JPEG'
+        content = encode(image, image_format)
+    except (OSError, Image.DecompressionBombError):
+        # Заголовок цел, а пиксели обрезаны или повреждены.
+        raise ValidationError('Не удалось прочитать картинку.',
+                              code='invalid')
+    name = '{}.{}'.format(os.path.splitext(file_.name)[0],
+                          EXTENSIONS[image_format])
+    return SimpleUploadedFile(name, content,
+                              content_type=Image.MIME[image_format])
@@ -0,0 +1,26 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core import replicas
+
+
+class Command(BaseCommand):
+    help = ('Снимает копии основной базы в реплики онлайн-бэкапом SQLite. '
+            'С --interval повторяет снимки, пока его не остановят.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval', type=float, default=0,
+            help='Секунды между снимками; 0 — снять один раз.'
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            for alias in settings.DATABASE_REPLICAS:
+                path = replicas.snapshot(alias)
+                self.stdout.write(self.style.SUCCESS(f'{alias}: {path}'))
+            if not options['interval']:
+                return
+            time.sleep(options['interval'])
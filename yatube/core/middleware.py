@@ -0,0 +1,85 @@
+import json
+import logging
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from . import timing
+from .querystats import QueryStats
+
+logger = logging.getLogger('core.timing')
+
+# Значения заголовков должны быть в latin-1, поэтому подписи английские.
+DESCRIPTIONS = {
+    'total': 'Total',
+    'view': 'View',
+    'db': 'Database',
+    'tpl': 'Templates',
+    'thumb': 'Thumbnails',
+}
+
+
+def format_metric(name, seconds, description):
+    return '{};dur={:.1f};desc="{}"'.format(name, seconds * 1000,
+                                            description)
+
+
+class ServerTimingMiddleware:
+    """Заголовок Server-Timing и строка лога с разбивкой времени запроса.
+
+    total — весь запрос ниже middleware, view — вызов представления,
+    db — SQL-запросы, tpl — рендер шаблонов, thumb — поиск и нарезка
+    миниатюр; запросы суммируются по всем базам, включая реплики.
+    Включается настройкой SERVER_TIMING.
+    """
+
+    def __init__(self, get_response):
+        if not settings.SERVER_TIMING:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timer = timing.start()
+        # Псевдонимы с общим соединением (зеркала в тестах) считаем раз.
+        aliases = {connections[alias].alias for alias in connections}
+        try:
+            with ExitStack() as stack:
+                stats = [stack.enter_context(QueryStats(alias))
+                         for alias in aliases]
+                begin = time.perf_counter()
+                response = self.get_response(request)
+                end = time.perf_counter()
+        finally:
+            timing.stop()
+        queries = sum(item.queries for item in stats)
+        rows = sum(item.rows for item in stats)
+        timer.add('total', end - begin)
+        view_begin = getattr(request, '_view_begin', None)
+        if view_begin is not None:
+            timer.add('view', end - view_begin)
+        timer.add('db', sum(item.time for item in stats))
+
+        descriptions = dict(
+            DESCRIPTIONS, db=f'{queries} queries, {rows} rows')
+        response['Server-Timing'] = ', '.join(
+            format_metric(name, timer.metrics[name][0], description)
+            for name, description in descriptions.items()
+            if name in timer.metrics
+        )
+
+        logger.info(json.dumps({
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'db_queries': queries,
+            'db_rows': rows,
+            **{f'{name}_ms': round(duration * 1000, 2)
+               for name, (duration, count) in timer.metrics.items()},
+        }))
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request._view_begin = time.perf_counter()
@@ -0,0 +1,14 @@
+from django.db import models
+
+
+class Blob(models.Model):
+    """Файл контентно-адресуемого хранилища и число ссылок на него."""
+    name = models.CharField('Имя файла', max_length=100, primary_key=True)
+    refs = models.PositiveIntegerField('Количество ссылок', default=0)
+
+    class Meta:
+        verbose_name = 'Файл'
+        verbose_name_plural = 'Файлы'
+
+    def __str__(self):
+        return self.name
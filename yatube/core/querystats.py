@@ -0,0 +1,89 @@
+"""Подсчёт SQL-запросов, их времени и прочитанных строк.
+
+QueryStats подключается к соединению через execute_wrapper и подменяет
+обёртку курсора, чтобы считать строки, которые Django забрал из базы.
+Отладочный курсор заменяется своим наследником, поэтому
+connection.queries и assertNumQueries продолжают видеть запросы.
+Блоки можно вкладывать: строки засчитываются всем активным счётчикам.
+"""
+import time
+
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.backends.utils import CursorDebugWrapper, CursorWrapper
+
+
+class RowCountingMixin:
+    def count(self, rows):
+        for stats in self.db.query_stats:
+            stats.rows += rows
+
+    def fetchone(self):
+        row = super().__getattr__('fetchone')()
+        if row is not None:
+            self.count(1)
+        return row
+
+    def fetchmany(self, *args):
+        rows = super().__getattr__('fetchmany')(*args)
+        self.count(len(rows))
+        return rows
+
+    def fetchall(self):
+        rows = super().__getattr__('fetchall')()
+        self.count(len(rows))
+        return rows
+
+    def __iter__(self):
+        for row in super().__iter__():
+            self.count(1)
+            yield row
+
+
+class RowCountingCursor(RowCountingMixin, CursorWrapper):
+    pass
+
+
+class RowCountingDebugCursor(RowCountingMixin, CursorDebugWrapper):
+    pass
+
+
+class QueryStats:
+    """Контекстный менеджер: queries, time (секунды) и rows за блок."""
+
+    def __init__(self, using=DEFAULT_DB_ALIAS):
+        self.db = connections[using]
+        self.queries = 0
+        self.time = 0.0
+        self.rows = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.time += time.perf_counter() - start
+            self.queries += 1
+
+    def make_cursor(self, cursor):
+        return RowCountingCursor(cursor, self.db)
+
+    def make_debug_cursor(self, cursor):
+        return RowCountingDebugCursor(cursor, self.db)
+
+    def __enter__(self):
+        self.wrapper = self.db.execute_wrapper(self)
+        self.wrapper.__enter__()
+        active = self.db.__dict__.setdefault('query_stats', [])
+        if not active:
+            self.db.make_cursor = self.make_cursor
+            self.db.make_debug_cursor = self.make_debug_cursor
+        active.append(self)
+        return self
+
+    def __exit__(self, *exc_info):
+        active = self.db.query_stats
+        active.remove(self)
+        if not active:
+            del self.db.make_cursor
+            del self.db.make_debug_cursor
+        return self.wrapper.__exit__(*exc_info)
@@ -0,0 +1,155 @@
+"""Чтение лент и страниц постов с реплик базы.
+
+Реплики — периодические копии основной SQLite, снятые онлайн-бэкапом
+(команда snapshot_replicas): копия пишется во временный файл и атомарно
+подменяет старую, поэтому читатели всегда видят целый снимок.
+
+Представления, помеченные @replica_reads, на GET и HEAD читают модели
+приложений из REPLICA_APPS с одной случайной реплики из
+DATABASE_REPLICAS; запись, аутентификация и сессии всегда идут в
+default. Реплика отстаёт от основной базы на интервал снимков, поэтому
+после запроса, который записал модели из REPLICA_APPS (пост,
+комментарий, подписку по GET-ссылке), клиент получает cookie и
+REPLICA_PIN_SECONDS читает только default: автор сразу видит свой пост,
+а подписчик — ленту нового автора. Счётчики, которым это не нужно
+(просмотры), пишутся внутри unpinned().
+
+    DATABASE_ROUTERS = ['core.replicas.ReplicaRouter']
+    MIDDLEWARE = [..., 'core.replicas.ReplicaPinMiddleware', ...]
+"""
+import os
+import random
+import sqlite3
+import threading
+from contextlib import contextmanager
+from functools import wraps
+
+from django.conf import settings
+from django.db import connections
+from django.db.transaction import TransactionManagementError
+
+PIN_COOKIE = 'replica_pin'
+SAFE_METHODS = ('GET', 'HEAD')
+
+_local = threading.local()
+
+
+def current():
+    """Реплика, с которой читает текущий запрос, или None."""
+    return getattr(_local, 'alias', None)
+
+
+def cache_version():
+    """Версия данных запроса для ключей кеша: '' для default.
+
+    Страница, прочитанная со снимка, кешируется отдельно и только до
+    следующего снимка, иначе закреплённый автор получил бы из кеша
+    страницу без своего поста.
+    """
+    return getattr(_local, 'version', '')
+
+
+def available():
+    """Реплики, для которых снимок уже снят."""
+    return [alias for alias in settings.DATABASE_REPLICAS
+            if os.path.exists(connections[alias].settings_dict['NAME'])]
+
+
+def is_pinned(request):
+    return PIN_COOKIE in request.COOKIES
+
+
+@contextmanager
+def unpinned():
+    """Записи внутри блока не закрепляют клиента за default."""
+    _local.unpinned = True
+    try:
+        yield
+    finally:
+        _local.unpinned = False
+
+
+def replica_reads(view):
+    """Читать данные представления с реплики, если клиент не закреплён."""
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        replicas = available()
+        if (request.method not in SAFE_METHODS or is_pinned(request)
+                or not replicas):
+            return view(request, *args, **kwargs)
+        alias = random.choice(replicas)
+        path = connections[alias].settings_dict['NAME']
+        _local.alias = alias
+        _local.version = f'{alias}:{os.stat(path).st_mtime_ns}'
+        try:
+            return view(request, *args, **kwargs)
+        finally:
+            _local.alias = None
+            _local.version = ''
+    return wrapper
+
+
+class ReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        alias = current()
+        if alias is None:
+            return None
+        instance = hints.get('instance')
+        if instance is not None and instance._state.db:
+            # Связанные объекты читаются оттуда же, откуда их владелец.
+            return instance._state.db
+        if model._meta.app_label in settings.REPLICA_APPS:
+            return alias
+        return None
+
+    def db_for_write(self, model, **hints):
+        if (model._meta.app_label in settings.REPLICA_APPS
+                and not getattr(_local, 'unpinned', False)):
+            _local.wrote = True
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Реплики — копии default, объекты с них взаимозаменяемы.
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        # Схема попадает в реплики вместе со снимком.
+        return db not in settings.DATABASE_REPLICAS
+
+
+class ReplicaPinMiddleware:
+    """После успешной записи клиент какое-то время читает только default."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        _local.wrote = False
+        response = self.get_response(request)
+        if _local.wrote and response.status_code < 400:
+            response.set_cookie(PIN_COOKIE, '1',
+                                max_age=settings.REPLICA_PIN_SECONDS,
+                                httponly=True, samesite='Lax')
+        return response
+
+
+def snapshot(alias):
+    """Снимает копию default в реплику alias онлайн-бэкапом SQLite."""
+    path = connections[alias].settings_dict['NAME']
+    temporary = f'{path}.tmp'
+    source = connections['default']
+    if source.in_atomic_block:
+        # Бэкап ждал бы, пока эта же транзакция отпустит базу.
+        raise TransactionManagementError(
+            'Снимок нельзя снимать внутри транзакции.')
+    source.ensure_connection()
+    target = sqlite3.connect(temporary)
+    try:
+        source.connection.backup(target)
+    finally:
+        target.close()
+    # Открытые соединения дочитывают старый файл, новые видят снимок.
+    os.replace(temporary, path)
+    connections[alias].close()
+    return path
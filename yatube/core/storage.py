@@ -0,0 +1,95 @@
+"""Хранилище картинок с именами по содержимому.
+
+Файл сохраняется под sha256 своих байтов, поэтому одна и та же картинка,
+загруженная к разным постам и комментариям, лежит на диске один раз, а
+sorl находит для неё уже нарезанные миниатюры. Число ссылок на файл
+хранится в Blob: save() его увеличивает, delete() уменьшает и удаляет
+файл с миниатюрами, только когда ссылок не осталось.
+
+Ссылка учитывается в транзакции того, кто сохраняет файл. Модели с
+такими полями сохраняются через AtomicSaveMixin: если запись строки
+не удалась, откатывается и ссылка, а не остаётся висеть в Blob.
+
+    class Post(AtomicSaveMixin, models.Model):
+        image = models.ImageField(upload_to='posts/',
+                                  storage=ContentAddressedStorage())
+"""
+import hashlib
+import os
+
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+from django.db import transaction
+from django.db.models import F
+from sorl.thumbnail import delete as delete_thumbnails
+from sorl.thumbnail.images import ImageFile
+
+from .models import Blob
+
+BLOB_DIR = 'blobs'
+
+
+def content_name(name, content):
+    """Имя файла по sha256 содержимого с расширением исходного имени."""
+    digest = hashlib.sha256()
+    for chunk in content.chunks():
+        digest.update(chunk)
+    digest = digest.hexdigest()
+    extension = os.path.splitext(name)[1].lower()
+    return f'{BLOB_DIR}/{digest[:2]}/{digest}{extension}'
+
+
+class ContentAddressedStorage(FileSystemStorage):
+
+    def is_blob(self, name):
+        return bool(name) and name.startswith(BLOB_DIR + '/')
+
+    def save(self, name, content, max_length=None):
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        name = content_name(name or content.name, content)
+        # Ссылка учитывается раньше записи: параллельный delete() уже не
+        # удалит файл, который мы считаем существующим.
+        with transaction.atomic():
+            Blob.objects.get_or_create(name=name)
+            Blob.objects.filter(name=name).update(refs=F('refs') + 1)
+        if not self.exists(name):
+            saved = self._save(name, content)
+            if saved != name:
+                # Тот же файл успел записать другой процесс.
+                super().delete(saved)
+        return name
+
+    def delete(self, name):
+        """Снимает ссылку на файл; удаляет его вместе с миниатюрами,
+        когда ссылок не осталось.
+
+        Файлы со старыми именами не из BLOB_DIR и файлы без учтённых
+        ссылок не трогаются.
+        """
+        if not self.is_blob(name):
+            return
+        with transaction.atomic():
+            released = Blob.objects.filter(name=name, refs__gt=0).update(
+                refs=F('refs') - 1)
+            # Без учтённых ссылок файл чужой: его записали в обход save().
+            if (not released
+                    or Blob.objects.filter(name=name, refs__gt=0).exists()):
+                return
+            Blob.objects.filter(name=name).delete()
+            delete_thumbnails(ImageFile(name, self), delete_file=False)
+            super().delete(name)
+
+
+class AtomicSaveMixin:
+    """save() модели и учёт ссылок на её файлы в одной транзакции."""
+
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+
+def release(storage, name):
+    """Снимает ссылку модели на файл после коммита транзакции."""
+    if name:
+        transaction.on_commit(lambda: storage.delete(name))
@@ -0,0 +1,61 @@
+from django import template
+from PIL import Image
+
+from core import thumbnails
+
+register = template.Library()
+
+
+@register.simple_tag
+def ready_thumbnail(file_, geometry):
+    """Готовая миниатюра или None; недостающую ставит в очередь.
+
+    {% ready_thumbnail post.image "960x339" as im %}
+    """
+    if not file_:
+        return None
+    thumbnail = thumbnails.find_thumbnail(file_, geometry)
+    if thumbnail is None and thumbnails.enqueue(file_):
+        thumbnail = thumbnails.find_thumbnail(file_, geometry)
+    return thumbnail
+
+
+def srcset(variants):
+    return ', '.join(f'{thumbnail.url} {width}w'
+                     for width, thumbnail in variants)
+
+
+@register.inclusion_tag('includes/responsive_image.html')
+def responsive_image(file_, geometry, sizes='100vw', lazy=True, alt='',
+                     css_class='card-img my-2'):
+    """<picture> со srcset из готовых вариантов или заглушка.
+
+    {% responsive_image post.image "1440x420" sizes="100vw" lazy=False %}
+    """
+    width, height = geometry.split('x')
+    context = {
+        'file': file_, 'width': width, 'height': height, 'sizes': sizes,
+        'lazy': lazy, 'alt': alt, 'css_class': css_class,
+    }
+    if not file_:
+        return context
+    found = thumbnails.find_variants(file_, geometry)
+    expected = (len(thumbnails.variants(geometry))
+                * len(thumbnails.VARIANT_FORMATS))
+    # Недостающие варианты, например у картинок, загруженных до появления
+    # srcset, дорезаются тем же проходом, что и новые.
+    if (sum(map(len, found.values())) < expected
+            and thumbnails.enqueue(file_)):
+        found = thumbnails.find_variants(file_, geometry)
+    if found:
+        context.update(
+            src=found['JPEG'][-1][1].url,
+            srcset=srcset(found['JPEG']),
+            sources=[
+                {'type': Image.MIME[image_format],
+                 'srcset': srcset(variants)}
+                for image_format, variants in found.items()
+                if image_format != 'JPEG'
+            ],
+        )
+    return context
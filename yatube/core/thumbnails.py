@@ -0,0 +1,220 @@
+"""Фоновая генерация миниатюр sorl-thumbnail.
+
+Загруженные картинки отправляются в пул процессов, который заранее
+нарезает все размеры из THUMBNAIL_SIZES вместе с узкими вариантами для
+srcset, декодируя исходник один раз. Шаблоны только ищут готовые
+миниатюры в key-value store sorl и, пока их нет, показывают заглушку,
+не блокируя рендер.
+"""
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.db import close_old_connections, connection, transaction
+from django.dispatch import Signal
+from PIL import features
+from sorl.thumbnail import default
+from sorl.thumbnail.conf import defaults as sorl_defaults
+from sorl.thumbnail.conf import settings as sorl_settings
+from sorl.thumbnail.images import ImageFile
+
+from . import timing
+
+logger = logging.getLogger(__name__)
+
+THUMBNAIL_SIZES = ('1440x420', '960x339')
+THUMBNAIL_OPTIONS = {'crop': 'center', 'upscale': True}
+# Ширины узких вариантов каждого размера для srcset.
+VARIANT_WIDTHS = (480, 960)
+# WebP нарезается, только если Pillow собран с его поддержкой.
+VARIANT_FORMATS = ('JPEG', 'WEBP') if features.check('webp') else ('JPEG',)
+
+thumbnails_ready = Signal(providing_args=['name', 'instance'])
+
+_executor = None
+_pending = set()
+_lock = threading.Lock()
+
+
+def init_worker(database_name):
+    django.setup()
+    # Воркер должен писать key-value store sorl в ту же базу, что и
+    # родитель, даже если её имя подменено (например, тестами).
+    connection.settings_dict['NAME'] = database_name
+
+
+def get_executor():
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(
+                max_workers=settings.THUMBNAIL_WORKERS,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=init_worker,
+                initargs=(connection.settings_dict['NAME'],),
+            )
+        return _executor
+
+
+def use_workers():
+    # База в памяти не видна другим процессам.
+    in_memory = getattr(connection, 'is_in_memory_db', lambda: False)()
+    return bool(settings.THUMBNAIL_WORKERS) and not in_memory
+
+
+def variants(geometry):
+    """Размеры вариантов той же пропорции, от узкого до geometry."""
+    width, height = map(int, geometry.split('x'))
+    return [f'{narrow}x{round(height * narrow / width)}'
+            for narrow in VARIANT_WIDTHS if narrow < width] + [geometry]
+
+
+def variant_options(image_format):
+    return {**THUMBNAIL_OPTIONS, 'format': image_format}
+
+
+def all_variants(source):
+    """(размер, опции, миниатюра) всех вариантов всех размеров."""
+    for size in THUMBNAIL_SIZES:
+        for geometry in variants(size):
+            for image_format in VARIANT_FORMATS:
+                options = resolve_options(
+                    source, variant_options(image_format))
+                name = default.backend._get_thumbnail_filename(
+                    source, geometry, options)
+                yield geometry, options, ImageFile(name, default.storage)
+
+
+def generate(source):
+    """Нарезает все варианты всех размеров, декодируя исходник один раз.
+
+    source — ImageFile sorl: ключи миниатюр зависят от хранилища
+    исходника, поэтому оно передаётся вместе с именем.
+    """
+    missing, ready = [], []
+    for geometry, options, thumbnail in all_variants(source):
+        if default.kvstore.get(thumbnail) is not None:
+            continue
+        # Как и ThumbnailBackend, существующий файл не перезаписывается:
+        # storage сохранил бы его под другим именем.
+        if sorl_settings.THUMBNAIL_FORCE_OVERWRITE or not thumbnail.exists():
+            missing.append((geometry, options, thumbnail))
+        else:
+            ready.append(thumbnail)
+    if missing:
+        backend = default.backend
+        source_image = default.engine.get_image(source)
+        try:
+            image_info = default.engine.get_image_info(source_image)
+            source.set_size(default.engine.get_image_size(source_image))
+            for geometry, options, thumbnail in missing:
+                options['image_info'] = image_info
+                backend._create_thumbnail(
+                    source_image, geometry, options, thumbnail)
+                ready.append(thumbnail)
+        finally:
+            default.engine.cleanup(source_image)
+    if ready:
+        default.kvstore.get_or_set(source)
+        for thumbnail in ready:
+            default.kvstore.set(thumbnail, source)
+
+
+def generate_in_worker(source):
+    try:
+        generate(source)
+    finally:
+        close_old_connections()
+
+
+def resolve_options(source, options):
+    """Опции миниатюры с умолчаниями так же, как у ThumbnailBackend."""
+    backend = default.backend
+    options = dict(options)
+    if sorl_settings.THUMBNAIL_PRESERVE_FORMAT:
+        options.setdefault('format', backend._get_format(source))
+    for key, value in backend.default_options.items():
+        options.setdefault(key, value)
+    for key, attr in backend.extra_options:
+        value = getattr(sorl_settings, attr)
+        if value != getattr(sorl_defaults, attr):
+            options.setdefault(key, value)
+    return options
+
+
+def thumbnail_name(source, geometry, options):
+    """Имя миниатюры так же, как его строит ThumbnailBackend."""
+    return default.backend._get_thumbnail_filename(
+        source, geometry, resolve_options(source, options))
+
+
+def find_thumbnail(file_, geometry, image_format='JPEG'):
+    """Готовая миниатюра или None, без обращения к Pillow."""
+    with timing.timed('thumb'):
+        source = ImageFile(file_)
+        name = thumbnail_name(source, geometry, variant_options(image_format))
+        return default.kvstore.get(ImageFile(name, default.storage))
+
+
+def find_variants(file_, geometry):
+    """{формат: [(ширина, миниатюра)]} готовых вариантов geometry.
+
+    Пустой словарь, пока не нарезан сам размер geometry в JPEG.
+    """
+    found = {}
+    for image_format in VARIANT_FORMATS:
+        for variant in reversed(variants(geometry)):
+            thumbnail = find_thumbnail(file_, variant, image_format)
+            if thumbnail is None:
+                if variant == geometry and image_format == 'JPEG':
+                    return {}
+                continue
+            found.setdefault(image_format, []).insert(
+                0, (thumbnail.width, thumbnail))
+    return found
+
+
+def source_exists(file_):
+    try:
+        return file_.storage.exists(file_.name)
+    except SuspiciousFileOperation:
+        return False
+
+
+def _finished(file_, future):
+    with _lock:
+        _pending.discard(file_.name)
+    if future.exception() is not None:
+        logger.error('Thumbnail generation failed for %s', file_.name,
+                     exc_info=future.exception())
+        return
+    thumbnails_ready.send(sender=None, name=file_.name,
+                          instance=getattr(file_, 'instance', None))
+
+
+def enqueue(file_):
+    """Ставит нарезку миниатюр в очередь после коммита транзакции.
+
+    Возвращает True, если миниатюры нарезаны сразу, без воркеров.
+    """
+    if not file_ or not source_exists(file_):
+        return False
+    if not use_workers():
+        with timing.timed('thumb'):
+            generate(ImageFile(file_))
+        return True
+
+    def submit():
+        with _lock:
+            if file_.name in _pending:
+                return
+            _pending.add(file_.name)
+        future = get_executor().submit(generate_in_worker, ImageFile(file_))
+        future.add_done_callback(lambda done: _finished(file_, done))
+
+    transaction.on_commit(submit)
+    return False
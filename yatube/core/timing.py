@@ -0,0 +1,51 @@
+"""Замеры времени частей запроса для заголовка Server-Timing.
+
+ServerTimingMiddleware заводит таймер на время запроса, а шаблоны и
+миниатюры добавляют в него своё время через timed(). Вне запроса
+timed() ничего не делает.
+"""
+import threading
+import time
+from contextlib import contextmanager
+
+_local = threading.local()
+
+
+class Timer:
+    def __init__(self):
+        self.metrics = {}
+        # Метрики с открытым timed(): шаблон, отрендеренный внутри
+        # другого шаблона, уже учтён во внешнем блоке.
+        self.active = set()
+
+    def add(self, name, seconds):
+        duration, count = self.metrics.get(name, (0.0, 0))
+        self.metrics[name] = (duration + seconds, count + 1)
+
+
+def current():
+    return getattr(_local, 'timer', None)
+
+
+def start():
+    _local.timer = Timer()
+    return _local.timer
+
+
+def stop():
+    _local.timer = None
+
+
+@contextmanager
+def timed(name):
+    timer = current()
+    if timer is None or name in timer.active:
+        yield
+        return
+    timer.active.add(name)
+    begin = time.perf_counter()
+    try:
+        yield
+    finally:
+        timer.active.discard(name)
+        timer.add(name, time.perf_counter() - begin)
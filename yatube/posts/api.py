@@ -0,0 +1,211 @@
+"""JSON API только для чтения: те же ленты, что и HTML, без шаблонов.
+
+Строки выбираются через .values() лишь с запрошенными полями
+(?fields=id,text,author), листаются курсором (?cursor=, ?limit=) и
+отдаются как есть, без создания экземпляров моделей.
+"""
+from functools import wraps
+
+from django.core.files.storage import default_storage
+from django.http import JsonResponse
+
+from . import follow_graph
+from .models import Comment, Group, Post, User
+from .paginators import CURSOR_PARAM, CommentPaginator, CursorPaginator
+from .timeline import TimelinePaginator
+
+FIELDS_PARAM = 'fields'
+LIMIT_PARAM = 'limit'
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 100
+
+# Публичное имя поля -> путь для .values().
+POST_FIELDS = {
+    'id': 'pk',
+    'text': 'text',
+    'pub_date': 'pub_date',
+    'author': 'author__username',
+    'group': 'group__slug',
+    'image': 'image',
+    'comments_count': 'comments_count',
+    # Подписан ли зритель на автора: id автора заменяется в mark_following.
+    'following': 'author_id',
+}
+COMMENT_FIELDS = {
+    'id': 'pk',
+    'author': 'author__username',
+    'text': 'text',
+    'created': 'created',
+}
+GROUP_FIELDS = {
+    'id': 'pk',
+    'title': 'title',
+    'slug': 'slug',
+    'description': 'description',
+    'posts_count': 'posts_count',
+}
+AUTHOR_FIELDS = {
+    'id': 'pk',
+    'username': 'username',
+    'first_name': 'first_name',
+    'last_name': 'last_name',
+    'posts_count': 'stats__posts_count',
+    'followers_count': 'stats__followers_count',
+    'following_count': 'stats__following_count',
+}
+CONVERTERS = {
+    'image': lambda name: default_storage.url(name) if name else None,
+}
+
+
+class ApiError(Exception):
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def error_response(message, status):
+    return JsonResponse({'error': message}, status=status)
+
+
+def api_view(view):
+    """Превращает ApiError в JSON-ответ с нужным статусом."""
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        try:
+            return view(request, *args, **kwargs)
+        except ApiError as exc:
+            return error_response(str(exc), exc.status)
+    return wrapper
+
+
+def get_fields(request, available):
+    raw = request.GET.get(FIELDS_PARAM)
+    if not raw:
+        return list(available)
+    fields = [field.strip() for field in raw.split(',') if field.strip()]
+    unknown = sorted(set(fields) - set(available))
+    if unknown:
+        raise ApiError('Неизвестные поля: {}'.format(', '.join(unknown)))
+    return fields
+
+
+def get_limit(request):
+    try:
+        limit = int(request.GET.get(LIMIT_PARAM, DEFAULT_LIMIT))
+    except ValueError:
+        raise ApiError('limit должен быть числом')
+    return max(1, min(limit, MAX_LIMIT))
+
+
+def get_lookups(fields, mapping, key_fields):
+    # Поля курсора выбираются всегда, даже если их не просили.
+    lookups = dict.fromkeys(mapping[field] for field in fields)
+    lookups.update(dict.fromkeys(key_fields))
+    return list(lookups)
+
+
+def serialize(row, fields, mapping):
+    data = {}
+    for field in fields:
+        value = row[mapping[field]]
+        converter = CONVERTERS.get(field)
+        data[field] = converter(value) if converter else value
+    return data
+
+
+def mark_following(request, posts, fields):
+    """Одно множество подписок зрителя на всю страницу постов."""
+    if 'following' not in fields:
+        return posts
+    followed = follow_graph.following_ids(request.user)
+    for post in posts:
+        post['following'] = post['following'] in followed
+    return posts
+
+
+def get_object(queryset, mapping, **lookups):
+    row = queryset.filter(**lookups).values(*mapping.values()).first()
+    if row is None:
+        raise ApiError('Не найдено', status=404)
+    return serialize(row, mapping, mapping)
+
+
+def posts_response(request, queryset, extra=None,
+                   paginator_class=CursorPaginator, **kwargs):
+    fields = get_fields(request, POST_FIELDS)
+    lookups = get_lookups(fields, POST_FIELDS, paginator_class.key_fields)
+    paginator = paginator_class(
+        queryset.values(*lookups), get_limit(request), **kwargs)
+    page = paginator.get_page(request.GET.get(CURSOR_PARAM))
+    return JsonResponse({
+        **(extra or {}),
+        'results': mark_following(
+            request,
+            [serialize(row, fields, POST_FIELDS)
+             for row in page.object_list],
+            fields,
+        ),
+        'next': paginator.next_cursor,
+        'previous': paginator.previous_cursor,
+    })
+
+
+class ValuesTimelinePaginator(TimelinePaginator):
+    """Лента подписок, где посты окна загружаются проекцией .values()."""
+
+    def load_posts(self, post_ids):
+        return {row['pk']: row
+                for row in self.object_list.filter(pk__in=post_ids)}
+
+
+@api_view
+def index(request):
+    return posts_response(request, Post.objects.all())
+
+
+@api_view
+def group_list(request, slug):
+    group = get_object(Group.objects.all(), GROUP_FIELDS, slug=slug)
+    return posts_response(request, Post.objects.filter(group_id=group['id']),
+                          {'group': group})
+
+
+@api_view
+def profile(request, username):
+    author = get_object(User.objects.all(), AUTHOR_FIELDS,
+                        username=username)
+    return posts_response(request, Post.objects.filter(author_id=author['id']),
+                          {'author': author})
+
+
+@api_view
+def post_detail(request, post_id):
+    fields = get_fields(request, POST_FIELDS)
+    post = get_object(
+        Post.objects.all(),
+        {field: POST_FIELDS[field] for field in fields},
+        pk=post_id,
+    )
+    comments = CommentPaginator(
+        Comment.objects.filter(post_id=post_id).values(
+            *COMMENT_FIELDS.values()),
+        get_limit(request),
+    )
+    page = comments.get_page(request.GET.get(CURSOR_PARAM))
+    return JsonResponse({
+        'post': mark_following(request, [post], fields)[0],
+        'comments': [serialize(row, COMMENT_FIELDS, COMMENT_FIELDS)
+                     for row in page.object_list],
+        'next': comments.next_cursor,
+        'previous': comments.previous_cursor,
+    })
+
+
+@api_view
+def follow_index(request):
+    if not request.user.is_authenticated:
+        raise ApiError('Требуется авторизация', status=401)
+    return posts_response(request, Post.objects.all(),
+                          paginator_class=ValuesTimelinePaginator,
+                          user=request.user)
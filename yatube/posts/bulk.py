@@ -0,0 +1,43 @@
+"""Помощники массовой загрузки для seed_data и import_data.
+
+bulk_create не вызывает save() и не шлёт сигналов, поэтому счётчики,
+ленты и поисковый индекс после загрузки строятся заново целиком.
+"""
+import itertools
+from contextlib import contextmanager
+
+from django.core.cache import cache
+from django.core.management import call_command
+
+from . import search, trending
+
+
+@contextmanager
+def manual_dates(*fields):
+    """Отключает auto_now_add, чтобы сохранить даты из источника."""
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        batch = list(itertools.islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def rebuild_derived(stdout, chunk_size=1000):
+    call_command('recount_counters', chunk_size=chunk_size, stdout=stdout)
+    call_command('rebuild_timelines', stdout=stdout)
+    trending.rebuild(chunk_size)
+    if search.is_available():
+        call_command('rebuild_search_index', stdout=stdout)
+    # Поколения лент не знают о загруженных постах.
+    cache.clear()
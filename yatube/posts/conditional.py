@@ -0,0 +1,124 @@
+"""Условные GET-запросы для лент и страницы поста.
+
+Валидаторы считаются одним индексным запросом до рендера. Для ленты это
+самый поздний Post.modified её постов и поля, которые страница
+показывает помимо постов (название группы, имя автора, счётчики
+подписок); для поста — его поля, счётчики и время последнего
+комментария. В ETag добавляется поколение ленты из feed_cache (оно
+меняется при правке и удалении постов), пользователь и строка запроса,
+поэтому разные версии страницы не путаются.
+
+Last-Modified — наибольшее из modified постов и времени последнего
+изменения ленты из feed_cache: удаление поста и правка группы или
+имени автора тоже его сдвигают. Если копия клиента актуальна,
+condition() отвечает 304 без вызова представления.
+"""
+import hashlib
+
+from django.db.models import OuterRef, Subquery
+from django.views.decorators.http import condition
+
+from . import feed_cache
+from .models import Comment, Group, Post, User
+
+
+class State:
+    def __init__(self, parts, last_modified):
+        self.parts = parts
+        self.last_modified = last_modified
+
+
+def request_state(request, get_state, *args, **kwargs):
+    """State запроса; get_state вызывается один раз на запрос."""
+    if not hasattr(request, '_conditional_state'):
+        request._conditional_state = get_state(request, *args, **kwargs)
+    return request._conditional_state
+
+
+def conditional(get_state):
+    """condition(), у которого ETag и Last-Modified берутся из get_state.
+
+    get_state(request, **kwargs) возвращает State или None, если
+    валидаторов нет.
+    """
+    def state(request, *args, **kwargs):
+        return request_state(request, get_state, *args, **kwargs)
+
+    def etag(request, *args, **kwargs):
+        current = state(request, *args, **kwargs)
+        if current is None:
+            return None
+        parts = (request.user.pk, request.get_full_path(), *current.parts)
+        digest = hashlib.md5(repr(parts).encode()).hexdigest()
+        # Слабый ETag: csrf-токен в форме меняется при каждом рендере.
+        return f'W/"{digest}"'
+
+    def last_modified(request, *args, **kwargs):
+        current = state(request, *args, **kwargs)
+        return current.last_modified if current is not None else None
+
+    return condition(etag_func=etag, last_modified_func=last_modified)
+
+
+def latest_modified(posts):
+    """Подзапрос: самый поздний modified среди posts."""
+    return Subquery(posts.order_by('-modified').values('modified')[:1])
+
+
+def feed_state(feed, modified, *parts):
+    if modified is None:
+        return None
+    generation = feed_cache.get_generation(feed)
+    return State((generation, modified, *parts),
+                 max(modified, feed_cache.get_changed(feed)))
+
+
+def index_state(request):
+    modified = Post.objects.order_by('-modified').values_list(
+        'modified', flat=True).first()
+    return feed_state(feed_cache.INDEX_FEED, modified)
+
+
+def group_state(request, slug):
+    row = Group.objects.filter(slug=slug).annotate(
+        modified=latest_modified(Post.objects.filter(group=OuterRef('pk')))
+    ).values_list('pk', 'modified', 'title', 'description').first()
+    if row is None:
+        return None
+    group_id, modified, *parts = row
+    return feed_state(feed_cache.group_feed(group_id), modified, *parts)
+
+
+def profile_state(request, username):
+    row = User.objects.filter(username=username).annotate(
+        modified=latest_modified(Post.objects.filter(author=OuterRef('pk')))
+    ).values_list(
+        'pk', 'modified', 'first_name', 'last_name',
+        'stats__followers_count', 'stats__following_count',
+    ).first()
+    if row is None:
+        return None
+    author_id, modified, *parts = row
+    return feed_state(feed_cache.profile_feed(author_id), modified, *parts)
+
+
+def post_state(request, post_id):
+    last_comment = Comment.objects.filter(
+        post=OuterRef('pk')).order_by('-created').values('created')[:1]
+    row = Post.objects.filter(pk=post_id).annotate(
+        last_comment=Subquery(last_comment)
+    ).values_list(
+        'modified', 'last_comment', 'text', 'image', 'group_id',
+        'comments_count', 'author_id', 'author__first_name',
+        'author__last_name', 'author__stats__posts_count',
+    ).first()
+    if row is None:
+        return None
+    modified, last_comment, text, *rest = row
+    # Лента автора сдвигается с его новыми постами и сменой имени.
+    feed = feed_cache.profile_feed(row[6])
+    parts = (feed_cache.get_generation(feed), modified, last_comment,
+             hashlib.md5(text.encode()).hexdigest(), *rest)
+    last_modified = max(filter(None, (
+        modified, last_comment, feed_cache.get_changed(feed))))
+    return State(parts, last_modified)
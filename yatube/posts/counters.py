@@ -0,0 +1,95 @@
+"""Денормализованные счётчики постов, комментариев и подписок.
+
+Счётчики меняются сигналами при записи (см. signals.py) и при
+расхождении пересчитываются командой recount_counters.
+"""
+from django.db import transaction
+from django.db.models import Count, F
+
+from . import feed_cache
+from .models import AuthorStats, Comment, Follow, Group, Post, User
+
+
+def bump(model, pk, **deltas):
+    model.objects.filter(pk=pk).update(
+        **{field: F(field) + delta for field, delta in deltas.items()}
+    )
+
+
+def bump_author(user_id, **deltas):
+    updated = AuthorStats.objects.filter(user_id=user_id).update(
+        **{field: F(field) + delta for field, delta in deltas.items()}
+    )
+    if not updated and all(delta > 0 for delta in deltas.values()):
+        # Строки ещё нет: создаём её пересчётом, а не с нуля.
+        recount_authors([user_id])
+
+
+def get_stats(user):
+    try:
+        return user.stats
+    except AuthorStats.DoesNotExist:
+        return AuthorStats(user=user)
+
+
+def chunked_pks(queryset, chunk_size):
+    last_pk = None
+    queryset = queryset.order_by('pk').values_list('pk', flat=True)
+    while True:
+        chunk = queryset if last_pk is None else queryset.filter(
+            pk__gt=last_pk)
+        pks = list(chunk[:chunk_size])
+        if not pks:
+            return
+        yield pks
+        last_pk = pks[-1]
+
+
+def count_by(queryset, field, pks):
+    return dict(
+        queryset.filter(**{f'{field}__in': pks})
+        .order_by()
+        .values(field)
+        .annotate(total=Count('pk'))
+        .values_list(field, 'total')
+    )
+
+
+@transaction.atomic
+def recount_authors(pks):
+    posts = count_by(Post.objects, 'author', pks)
+    followers = count_by(Follow.objects, 'author', pks)
+    following = count_by(Follow.objects, 'user', pks)
+    existing = AuthorStats.objects.in_bulk(pks)
+    missing = []
+    for pk in User.objects.filter(pk__in=pks).values_list('pk', flat=True):
+        stats = existing.get(pk) or AuthorStats(user_id=pk)
+        stats.posts_count = posts.get(pk, 0)
+        stats.followers_count = followers.get(pk, 0)
+        stats.following_count = following.get(pk, 0)
+        if pk not in existing:
+            missing.append(stats)
+    AuthorStats.objects.bulk_create(missing)
+    AuthorStats.objects.bulk_update(
+        existing.values(),
+        ['posts_count', 'followers_count', 'following_count']
+    )
+
+
+@transaction.atomic
+def recount_groups(pks):
+    posts = count_by(Post.objects, 'group', pks)
+    groups = list(Group.objects.filter(pk__in=pks))
+    for group in groups:
+        group.posts_count = posts.get(group.pk, 0)
+    Group.objects.bulk_update(groups, ['posts_count'])
+    feed_cache.invalidate(feed_cache.GROUPS_FEED)
+
+
+@transaction.atomic
+def recount_posts(pks):
+    comments = count_by(Comment.objects, 'post', pks)
+    posts = list(Post.objects.filter(pk__in=pks).only('pk'))
+    for post in posts:
+        post.comments_count = comments.get(post.pk, 0)
+    Post.objects.bulk_update(posts, ['comments_count'])
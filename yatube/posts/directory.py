@@ -0,0 +1,45 @@
+"""Каталог групп.
+
+Число постов берётся из денормализованного Group.posts_count, дата и
+начало последнего поста — подзапросами по индексу (group, pub_date),
+так что весь каталог читается одним запросом без обхода group.posts.
+Готовый список кешируется с поколением ленты GROUPS_FEED, которое
+сдвигается при записи постов в группы и при изменении самих групп.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import OuterRef, Subquery
+from django.db.models.functions import Substr
+
+from core import replicas
+from . import feed_cache
+from .models import Group, Post
+
+DIRECTORY_KEY = 'groups:directory:{}:{}'
+PREVIEW_LENGTH = 200
+
+
+def query_groups():
+    latest = Post.objects.filter(group=OuterRef('pk')).order_by(
+        '-pub_date', '-id')
+    return list(
+        Group.objects.annotate(
+            latest_id=Subquery(latest.values('id')[:1]),
+            latest_pub_date=Subquery(latest.values('pub_date')[:1]),
+            latest_preview=Subquery(latest.annotate(
+                preview=Substr('text', 1, PREVIEW_LENGTH)
+            ).values('preview')[:1]),
+        ).order_by('title').values(
+            'slug', 'title', 'description', 'posts_count',
+            'latest_id', 'latest_pub_date', 'latest_preview',
+        )
+    )
+
+
+def get_groups():
+    """Строки каталога: поля группы и её последнего поста."""
+    key = DIRECTORY_KEY.format(
+        feed_cache.get_generation(feed_cache.GROUPS_FEED),
+        replicas.cache_version())
+    return cache.get_or_set(key, query_groups,
+                            settings.FEED_CACHE_TIMEOUT)
@@ -0,0 +1,59 @@
+"""Потоковая выгрузка постов автора или группы в CSV и JSONL.
+
+Строки читаются из базы через .values().iterator(chunk_size) и сразу
+отдаются наружу, поэтому память не растёт с числом постов.
+"""
+import csv
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+
+from .api import POST_FIELDS, serialize
+
+CHUNK_SIZE = 2000
+FORMATS = {
+    'csv': 'text/csv; charset=utf-8',
+    'jsonl': 'application/x-ndjson; charset=utf-8',
+}
+
+
+class Echo:
+    """Псевдофайл для csv.writer: writerow возвращает готовую строку."""
+
+    def write(self, value):
+        return value
+
+
+def export_rows(queryset, chunk_size=CHUNK_SIZE):
+    rows = queryset.values(*POST_FIELDS.values()).iterator(
+        chunk_size=chunk_size)
+    for row in rows:
+        yield serialize(row, POST_FIELDS, POST_FIELDS)
+
+
+def csv_lines(rows):
+    writer = csv.DictWriter(Echo(), fieldnames=list(POST_FIELDS))
+    yield writer.writerow(dict(zip(POST_FIELDS, POST_FIELDS)))
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def jsonl_lines(rows):
+    for row in rows:
+        yield json.dumps(row, cls=DjangoJSONEncoder, ensure_ascii=False) + '\n'
+
+
+def export_lines(queryset, export_format, chunk_size=CHUNK_SIZE):
+    lines = csv_lines if export_format == 'csv' else jsonl_lines
+    return lines(export_rows(queryset, chunk_size))
+
+
+def streaming_response(queryset, export_format, filename):
+    response = StreamingHttpResponse(
+        export_lines(queryset, export_format),
+        content_type=FORMATS[export_format],
+    )
+    response['Content-Disposition'] = (
+        f'attachment; filename="{filename}.{export_format}"')
+    return response
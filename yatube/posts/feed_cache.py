@@ -0,0 +1,153 @@
+"""Кеш страниц лент index, group_list и profile.
+
+Ключ страницы состоит из имени ленты, её поколения и номера страницы
+или курсора. Сохранение и удаление поста увеличивают поколение
+затронутых лент, поэтому старые страницы просто перестают читаться и
+истекают сами, а новый пост виден сразу, несмотря на долгий TTL.
+Карточки на страницах показывают имя автора и группу, поэтому правка
+группы или имени пользователя сдвигает все ленты, где они видны.
+
+Вместе с поколением запоминается время последнего изменения ленты:
+удалённый пост не оставляет строки, по которой можно было бы посчитать
+Last-Modified. touch() сдвигает только время — для изменений, которые
+видны на странице, но не в закешированном списке постов (счётчики
+подписок).
+"""
+import hashlib
+import time
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import Page, Paginator
+
+from core import replicas
+from .models import Post
+from .paginators import CURSOR_PARAM, PAGE_PARAM, CursorPaginator, paginate
+
+INDEX_FEED = 'index'
+# Каталог групп: счётчики и последний пост меняются с постами групп.
+GROUPS_FEED = 'groups'
+GENERATION_KEY = 'feed:generation:{}'
+CHANGED_KEY = 'feed:changed:{}'
+PAGE_KEY = 'feed:page:{}:{}:{}:{}'
+
+
+def group_feed(group_id):
+    return f'group:{group_id}'
+
+
+def profile_feed(author_id):
+    return f'profile:{author_id}'
+
+
+def get_generation(feed):
+    key = GENERATION_KEY.format(feed)
+    generation = cache.get(key)
+    if generation is None:
+        # Поколение могло вытесниться из кеша: начинаем с отметки времени,
+        # чтобы не совпасть с поколениями уже лежащих страниц.
+        cache.add(key, time.time_ns(), None)
+        generation = cache.get(key)
+    return generation
+
+
+def get_changed(feed):
+    """Время последнего изменения ленты для Last-Modified."""
+    key = CHANGED_KEY.format(feed)
+    changed = cache.get(key)
+    if changed is None:
+        # Отметка вытеснилась: считаем, что лента изменилась только что.
+        cache.add(key, time.time(), None)
+        changed = cache.get(key)
+    return datetime.fromtimestamp(changed, timezone.utc)
+
+
+def touch(*feeds):
+    cache.set_many(
+        {CHANGED_KEY.format(feed): time.time() for feed in feeds}, None)
+
+
+def invalidate(*feeds):
+    for feed in feeds:
+        try:
+            cache.incr(GENERATION_KEY.format(feed))
+        except ValueError:
+            cache.set(GENERATION_KEY.format(feed), time.time_ns(), None)
+    touch(*feeds)
+
+
+def invalidate_post(post, old_group_id=None):
+    feeds = {INDEX_FEED, profile_feed(post.author_id)}
+    for group_id in (post.group_id, old_group_id):
+        if group_id:
+            feeds.update((group_feed(group_id), GROUPS_FEED))
+    invalidate(*feeds)
+
+
+def invalidate_group(group_id):
+    author_ids = Post.objects.filter(group_id=group_id).values_list(
+        'author_id', flat=True).distinct()
+    invalidate(INDEX_FEED, GROUPS_FEED, group_feed(group_id),
+               *map(profile_feed, author_ids))
+
+
+def invalidate_author(author_id):
+    group_ids = Post.objects.filter(
+        author_id=author_id, group__isnull=False
+    ).values_list('group_id', flat=True).distinct()
+    invalidate(INDEX_FEED, profile_feed(author_id),
+               *map(group_feed, group_ids))
+
+
+def get_page_key(request, feed):
+    position = '{}|{}'.format(
+        request.GET.get(PAGE_PARAM, ''), request.GET.get(CURSOR_PARAM, ''))
+    return PAGE_KEY.format(
+        feed,
+        get_generation(feed),
+        replicas.cache_version(),
+        hashlib.md5(position.encode()).hexdigest(),
+    )
+
+
+def dump_page(page_obj):
+    paginator = page_obj.paginator
+    if getattr(paginator, 'is_cursor', False):
+        return {
+            'object_list': list(page_obj.object_list),
+            'next_cursor': paginator.next_cursor,
+            'previous_cursor': paginator.previous_cursor,
+        }
+    return {
+        'object_list': list(page_obj.object_list),
+        'number': page_obj.number,
+        'count': paginator.count,
+    }
+
+
+def load_page(data, queryset, per_page):
+    if 'count' in data:
+        paginator = Paginator(queryset, per_page)
+        paginator.count = data['count']
+        return Page(data['object_list'], data['number'], paginator)
+    paginator = CursorPaginator(queryset, per_page)
+    paginator.next_cursor = data['next_cursor']
+    paginator.previous_cursor = data['previous_cursor']
+    return Page(data['object_list'], 1, paginator)
+
+
+def get_page_context(request, feed, queryset, per_page):
+    """Контекст страницы ленты: page_obj и ключ для {% cache %}."""
+    key = get_page_key(request, feed)
+    # get_or_set, чтобы общий кеш считал страницу в одном процессе.
+    data = cache.get_or_set(
+        key,
+        lambda: dump_page(paginate(request, queryset, per_page)),
+        settings.FEED_CACHE_TIMEOUT,
+    )
+    return {
+        'page_obj': load_page(data, queryset, per_page),
+        'feed_key': key,
+        'feed_timeout': settings.FEED_CACHE_TIMEOUT,
+    }
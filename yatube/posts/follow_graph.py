@@ -0,0 +1,48 @@
+"""На кого подписан зритель.
+
+Множество id авторов, на которых подписан пользователь, читается из
+общего кеша (или одним запросом к Follow) не больше раза за запрос и
+запоминается на объекте пользователя. Дальше «подписан ли он на X»
+для любой страницы авторов — проверка вхождения в множество. Сигналы
+подписки и отписки сбрасывают кеш подписчика.
+
+Множество всегда читается из default: снимок реплики отстаёт, а
+сброшенный сигналом кеш иначе заполнился бы старыми подписками на
+FOLLOW_GRAPH_TIMEOUT.
+"""
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import Follow
+
+FOLLOWING_KEY = 'follow:following:{}'
+
+
+def following_ids(user):
+    """frozenset id авторов, на которых подписан user."""
+    if not user.is_authenticated:
+        return frozenset()
+    ids = getattr(user, '_following_ids', None)
+    if ids is None:
+        key = FOLLOWING_KEY.format(user.pk)
+        ids = cache.get(key)
+        if ids is None:
+            ids = frozenset(Follow.objects.using('default').filter(
+                user_id=user.pk).values_list('author_id', flat=True))
+            cache.set(key, ids, settings.FOLLOW_GRAPH_TIMEOUT)
+        user._following_ids = ids
+    return ids
+
+
+def is_following(user, author_id):
+    return author_id in following_ids(user)
+
+
+def following_map(user, author_ids):
+    """{id автора: подписан ли user} для страницы авторов."""
+    ids = following_ids(user)
+    return {author_id: author_id in ids for author_id in author_ids}
+
+
+def invalidate(user_id):
+    cache.delete(FOLLOWING_KEY.format(user_id))
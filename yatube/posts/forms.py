@@ -1,15 +1,27 @@
 from django import forms
+from django.core.files.uploadedfile import UploadedFile
 
+from core import images
 from .models import Post, Comment
 
 
-class PostForm(forms.ModelForm):
+class ImageIngestMixin:
+    """Новая загрузка в поле image проходит core.images.ingest."""
+
+    def clean_image(self):
+        image = self.cleaned_data.get('image')
+        if isinstance(image, UploadedFile):
+            return images.ingest(image)
+        return image
+
+
+class PostForm(ImageIngestMixin, forms.ModelForm):
     class Meta:
         model = Post
         fields = ('group', 'text', 'image')
 
 
-class CommentForm(forms.ModelForm):
+class CommentForm(ImageIngestMixin, forms.ModelForm):
     class Meta:
         model = Comment
         fields = ("text", 'image')
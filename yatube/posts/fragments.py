@@ -0,0 +1,42 @@
+"""Кеш отрендеренных карточек постов.
+
+Ключ карточки — шаблон, id поста, время его изменения и ленивая ли
+загрузка картинки (первые карточки страницы грузятся сразу): правка поста
+сама даёт новый ключ, а старая карточка истекает по таймауту. Правка
+группы или имени автора сдвигает modified всех их постов (signals.py).
+Карточки страницы читаются одним get_many, недостающие рендерятся и
+пишутся одним set_many. Карточка не зависит от пользователя, поэтому
+рендерится без запроса и общая для всех.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+CARD_KEY = 'post:card:{}:{}:{}:{}'
+# Первые карточки страницы видны сразу: их картинки грузятся без lazy.
+EAGER_CARDS = 2
+
+
+def card_key(template_name, post, lazy=True):
+    return CARD_KEY.format(
+        template_name, post.pk, post.modified.timestamp(), int(lazy))
+
+
+def render_cards(posts, template_name):
+    """Карточки постов страницы: [(пост, html)]."""
+    posts = list(posts)
+    lazy = [index >= EAGER_CARDS for index in range(len(posts))]
+    keys = [card_key(template_name, post, is_lazy)
+            for post, is_lazy in zip(posts, lazy)]
+    cached = cache.get_many(keys)
+    cards, rendered = [], {}
+    for post, key, is_lazy in zip(posts, keys, lazy):
+        html = cached.get(key)
+        if html is None:
+            html = rendered[key] = render_to_string(
+                template_name, {'post': post, 'lazy': is_lazy})
+        cards.append((post, mark_safe(html)))
+    if rendered:
+        cache.set_many(rendered, settings.FEED_CACHE_TIMEOUT)
+    return cards
@@ -0,0 +1,171 @@
+import json
+import math
+import time
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Count
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+
+from core.querystats import QueryStats
+from posts import urls
+from posts.models import Follow, Group, Post, User
+
+PERCENTILES = (50, 95, 99)
+
+
+def percentile(values, percent):
+    """Процентиль по ближайшему рангу."""
+    ordered = sorted(values)
+    index = max(0, math.ceil(percent / 100 * len(ordered)) - 1)
+    return ordered[index]
+
+
+class Command(BaseCommand):
+    help = ('Прогоняет все адреса posts/urls.py через тестовый клиент и '
+            'выводит p50/p95/p99, число SQL-запросов и прочитанных строк.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=50)
+        parser.add_argument('--warmup', type=int, default=3)
+        parser.add_argument(
+            '--cold', action='store_true',
+            help='Очищать кеш перед каждым запросом.'
+        )
+        parser.add_argument(
+            '--only', nargs='+', metavar='NAME',
+            help='Имена адресов, которые нужно измерить.'
+        )
+        parser.add_argument('--json', metavar='PATH',
+                            help='Куда сохранить результаты.')
+        parser.add_argument('--compare', metavar='PATH',
+                            help='JSON предыдущего прогона для сравнения.')
+
+    def handle(self, *args, **options):
+        if options['iterations'] < 1:
+            raise CommandError('--iterations должно быть больше нуля')
+        samples = self.get_samples()
+        client = Client()
+        client.force_login(samples['reader'])
+        results = {}
+        # Адреса вроде follow и comment пишут в базу: всё откатываем.
+        with transaction.atomic():
+            for name, url, setup in self.get_scenarios(samples):
+                if options['only'] and name not in options['only']:
+                    continue
+                results[name] = self.measure(client, url, setup, options)
+                self.write_row(name, results[name])
+            transaction.set_rollback(True)
+
+        report = {
+            'created': timezone.now().isoformat(),
+            'options': {key: options[key]
+                        for key in ('iterations', 'warmup', 'cold')},
+            'scenarios': results,
+        }
+        if options['json']:
+            with open(options['json'], 'w') as file:
+                json.dump(report, file, ensure_ascii=False, indent=2)
+            self.stdout.write(f'Результаты сохранены в {options["json"]}')
+        if options['compare']:
+            self.compare(results, options['compare'])
+        self.stdout.write(self.style.SUCCESS('Бенчмарк завершён'))
+
+    def get_samples(self):
+        """Самые тяжёлые объекты: на них видно поведение под нагрузкой."""
+        reader = User.objects.annotate(
+            follows=Count('follower')).order_by('-follows', 'pk').first()
+        author = User.objects.annotate(
+            posts_total=Count('posts')).order_by('-posts_total', 'pk').first()
+        group = Group.objects.order_by('-posts_count', 'pk').first()
+        post = Post.objects.order_by('-comments_count', '-pk').first()
+        if None in (reader, author, group, post):
+            raise CommandError('База пуста: сначала запустите seed_data')
+        own_post = Post.objects.filter(author=reader).first() or post
+        return {
+            'reader': reader,
+            'author': author,
+            'group': group,
+            'post': post,
+            'own_post': own_post,
+        }
+
+    def get_scenarios(self, samples):
+        reader, author = samples['reader'], samples['author']
+        if reader == author:
+            author = User.objects.exclude(pk=reader.pk).first() or author
+
+        def follow():
+            Follow.objects.get_or_create(user=reader, author=author)
+
+        def unfollow():
+            Follow.objects.filter(user=reader, author=author).delete()
+
+        values = {
+            'slug': samples['group'].slug,
+            'username': author.username,
+            'post_id': samples['post'].pk,
+        }
+        # Каждый замер должен проходить по настоящему пути записи.
+        setups = {'profile_follow': unfollow, 'profile_unfollow': follow}
+        for pattern in urls.urlpatterns:
+            kwargs = {name: values[name]
+                      for name in pattern.pattern.converters}
+            if pattern.name == 'post_edit':
+                kwargs['post_id'] = samples['own_post'].pk
+            url = reverse(f'{urls.app_name}:{pattern.name}', kwargs=kwargs)
+            if pattern.name == 'search':
+                url += '?q=' + samples['post'].text.split()[0]
+            yield pattern.name, url, setups.get(pattern.name)
+
+    def measure(self, client, url, setup, options):
+        timings, queries, rows = [], [], []
+        status = None
+        for iteration in range(options['warmup'] + options['iterations']):
+            if setup is not None:
+                setup()
+            if options['cold']:
+                cache.clear()
+            with QueryStats() as stats:
+                start = time.perf_counter()
+                response = client.get(url)
+                elapsed = time.perf_counter() - start
+            status = response.status_code
+            if iteration < options['warmup']:
+                continue
+            timings.append(elapsed * 1000)
+            queries.append(stats.queries)
+            rows.append(stats.rows)
+        result = {'url': url, 'status': status}
+        for percent in PERCENTILES:
+            result[f'p{percent}'] = round(percentile(timings, percent), 3)
+        result['queries'] = round(sum(queries) / len(queries), 2)
+        result['rows'] = round(sum(rows) / len(rows), 2)
+        return result
+
+    def write_row(self, name, result):
+        self.stdout.write(
+            '{:<18} {:>4} p50={p50:>8.2f}ms p95={p95:>8.2f}ms '
+            'p99={p99:>8.2f}ms queries={queries:>6} rows={rows:>8}'.format(
+                name, result['status'], **result)
+        )
+
+    def compare(self, results, path):
+        with open(path) as file:
+            baseline = json.load(file)['scenarios']
+        self.stdout.write(f'Сравнение с {path}:')
+        for name, result in results.items():
+            if name not in baseline:
+                continue
+            before = baseline[name]
+            change = (result['p95'] - before['p95']) / max(
+                before['p95'], 0.001) * 100
+            self.stdout.write(
+                f'{name:<18} p95 {before["p95"]:.2f} -> {result["p95"]:.2f}ms '
+                f'({change:+.1f}%), queries {before["queries"]} -> '
+                f'{result["queries"]}, rows {before["rows"]} -> '
+                f'{result["rows"]}'
+            )
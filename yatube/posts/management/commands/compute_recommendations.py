@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from posts import recommendations
+
+
+class Command(BaseCommand):
+    help = ('Пересчитывает рекомендации «на кого подписаться» по друзьям '
+            'друзей и общим группам авторов.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--top', type=int, default=recommendations.TOP_N,
+            help='Сколько рекомендаций хранить на пользователя.'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=recommendations.CHUNK_SIZE,
+            help='Сколько пользователей обрабатывать за раз.'
+        )
+
+    def handle(self, *args, **options):
+        total = recommendations.rebuild(options['top'],
+                                        options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(f'Рекомендаций: {total}'))
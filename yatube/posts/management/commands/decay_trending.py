@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from posts import trending
+
+
+class Command(BaseCommand):
+    help = ('Состаривает оценки популярных постов. Запускается по '
+            'расписанию с тем же интервалом, что передан в --hours.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--hours', type=float, default=1,
+            help='Сколько часов прошло с прошлого запуска.'
+        )
+
+    def handle(self, *args, **options):
+        total = trending.decay(options['hours'] * 60 * 60)
+        self.stdout.write(self.style.SUCCESS(f'Состарено постов: {total}'))
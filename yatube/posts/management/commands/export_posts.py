@@ -0,0 +1,47 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from posts import export
+from posts.models import Group, Post, User
+
+
+class Command(BaseCommand):
+    help = ('Потоково выгружает посты автора или группы в CSV или JSONL, '
+            'не держа их в памяти.')
+
+    def add_arguments(self, parser):
+        source = parser.add_mutually_exclusive_group()
+        source.add_argument('--author', metavar='USERNAME')
+        source.add_argument('--group', metavar='SLUG')
+        parser.add_argument('--format', choices=sorted(export.FORMATS),
+                            default='csv')
+        parser.add_argument('--output', metavar='PATH',
+                            help='Файл для выгрузки; по умолчанию stdout.')
+        parser.add_argument('--chunk-size', type=int,
+                            default=export.CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        if not options['author'] and not options['group']:
+            raise CommandError('Укажите --author или --group')
+        if options['author']:
+            if not User.objects.filter(username=options['author']).exists():
+                raise CommandError('Автор не найден')
+            posts = Post.objects.filter(author__username=options['author'])
+        else:
+            if not Group.objects.filter(slug=options['group']).exists():
+                raise CommandError('Группа не найдена')
+            posts = Post.objects.filter(group__slug=options['group'])
+        lines = export.export_lines(
+            posts, options['format'], options['chunk_size'])
+        if not options['output']:
+            for line in lines:
+                self.stdout.write(line, ending='')
+            return
+        # Первая строка CSV — заголовок, а не пост.
+        total = -1 if options['format'] == 'csv' else 0
+        with open(options['output'], 'w', encoding='utf-8',
+                  newline='') as file:
+            for line in lines:
+                file.write(line)
+                total += 1
+        self.stdout.write(self.style.SUCCESS(
+            f'Выгружено постов: {total} в {options["output"]}'))
@@ -0,0 +1,211 @@
+import csv
+import json
+import os
+import time
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from posts.bulk import batched, manual_dates, rebuild_derived
+from posts.models import Comment, Follow, Group, Post, User
+
+# Порядок загрузки: ссылки идут только на уже загруженные сущности.
+KINDS = ('users', 'groups', 'posts', 'comments', 'follows')
+
+
+def read_records(path):
+    """Построчно читает JSONL или CSV, не загружая файл в память."""
+    with open(path, encoding='utf-8', newline='') as file:
+        if os.path.splitext(path)[1].lower() == '.csv':
+            for record in csv.DictReader(file):
+                # Пустая ячейка CSV — то же, что отсутствующее поле.
+                yield {key: value for key, value in record.items()
+                       if value != ''}
+            return
+        for number, line in enumerate(file, 1):
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError as exc:
+                raise CommandError(f'{path}:{number}: {exc}')
+
+
+class Command(BaseCommand):
+    help = ('Потоково загружает пользователей, группы, посты, комментарии '
+            'и подписки из JSONL или CSV пачками через bulk_create, затем '
+            'пересчитывает счётчики, ленты и поисковый индекс.')
+
+    def add_arguments(self, parser):
+        for kind in KINDS:
+            parser.add_argument(
+                f'--{kind}', metavar='PATH',
+                help=f'Файл .jsonl или .csv с записями {kind}.'
+            )
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Сколько записей вставлять в одной транзакции.'
+        )
+        parser.add_argument(
+            '--skip-rebuild', action='store_true',
+            help='Не пересчитывать производные данные после загрузки.'
+        )
+
+    def handle(self, *args, **options):
+        self.batch_size = options['batch_size']
+        self.verbosity = options['verbosity']
+        # Id из источника -> id в базе; ссылки разрешаются через них.
+        self.ids = {'users': {}, 'groups': {}, 'posts': {}}
+        self.password = make_password(None)
+        started = time.perf_counter()
+        total = 0
+        # Даты берутся из источника, а не проставляются при вставке.
+        with manual_dates(Post._meta.get_field('pub_date'),
+                          Comment._meta.get_field('created')):
+            for kind in KINDS:
+                if options[kind]:
+                    total += self.load(kind, options[kind])
+        if total and not options['skip_rebuild']:
+            rebuild_derived(self.stdout, self.batch_size)
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Загружено записей: {total} за {elapsed:.1f} с'))
+
+    def load(self, kind, path):
+        loader = getattr(self, f'load_{kind}')
+        started = time.perf_counter()
+        loaded = skipped = 0
+        for batch in batched(read_records(path), self.batch_size):
+            try:
+                with transaction.atomic():
+                    created = loader(batch)
+            except KeyError as exc:
+                raise CommandError(f'{path}: нет обязательного поля {exc}')
+            loaded += created
+            skipped += len(batch) - created
+            if self.verbosity > 1:
+                self.stdout.write(f'{kind}: {loaded}')
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f'{kind}: {loaded} за {elapsed:.1f} с '
+            f'({loaded / max(elapsed, 1e-6):.0f} строк/с), '
+            f'пропущено {skipped}'
+        )
+        return loaded
+
+    def resolve(self, kind, source_id):
+        if source_id is None:
+            return None
+        return self.ids[kind].get(str(source_id))
+
+    def remember(self, kind, records, pks):
+        for record, pk in zip(records, pks):
+            if record.get('id') is not None:
+                self.ids[kind][str(record['id'])] = pk
+
+    def parse_date(self, value):
+        if value is None:
+            return timezone.now()
+        date = parse_datetime(value)
+        if date is None:
+            raise CommandError(f'Неверная дата: {value}')
+        if timezone.is_naive(date):
+            date = timezone.make_aware(date)
+        return date
+
+    def insert(self, model, objects):
+        """bulk_create, возвращающий id вставленных строк по порядку."""
+        created = model.objects.bulk_create(objects)
+        if not created or created[0].pk is not None:
+            return [obj.pk for obj in created]
+        # SQLite не отдаёт id из bulk_create. Писатель у него один, и до
+        # конца транзакции пачки последние id в таблице — наши.
+        pks = model.objects.order_by('-pk').values_list('pk', flat=True)
+        return list(pks[:len(created)])[::-1]
+
+    def load_natural(self, kind, model, field, records, build):
+        """Загрузка по естественному ключу: существующие не дублируются."""
+        by_key = {record[field]: record for record in records}
+        existing = set(model.objects.filter(
+            **{f'{field}__in': by_key}).values_list(field, flat=True))
+        model.objects.bulk_create(
+            build(record) for key, record in by_key.items()
+            if key not in existing
+        )
+        pks = dict(model.objects.filter(
+            **{f'{field}__in': by_key}).values_list(field, 'pk'))
+        self.remember(kind, records,
+                      [pks[record[field]] for record in records])
+        return len(by_key) - len(existing)
+
+    def build_user(self, record):
+        return User(
+            username=record['username'],
+            first_name=record.get('first_name', ''),
+            last_name=record.get('last_name', ''),
+            email=record.get('email', ''),
+            password=record.get('password', self.password),
+        )
+
+    def build_group(self, record):
+        return Group(
+            title=record['title'],
+            slug=record['slug'],
+            description=record.get('description', ''),
+        )
+
+    def load_users(self, records):
+        return self.load_natural('users', User, 'username', records,
+                                 self.build_user)
+
+    def load_groups(self, records):
+        return self.load_natural('groups', Group, 'slug', records,
+                                 self.build_group)
+
+    def load_posts(self, records):
+        loaded, posts = [], []
+        for record in records:
+            author_id = self.resolve('users', record.get('author'))
+            if author_id is None:
+                continue
+            loaded.append(record)
+            posts.append(Post(
+                text=record['text'],
+                author_id=author_id,
+                group_id=self.resolve('groups', record.get('group')),
+                image=record.get('image', ''),
+                pub_date=self.parse_date(record.get('pub_date')),
+            ))
+        self.remember('posts', loaded, self.insert(Post, posts))
+        return len(posts)
+
+    def load_comments(self, records):
+        comments = []
+        for record in records:
+            post_id = self.resolve('posts', record.get('post'))
+            author_id = self.resolve('users', record.get('author'))
+            if post_id is None or author_id is None:
+                continue
+            comments.append(Comment(
+                post_id=post_id,
+                author_id=author_id,
+                text=record['text'],
+                created=self.parse_date(record.get('created')),
+            ))
+        Comment.objects.bulk_create(comments)
+        return len(comments)
+
+    def load_follows(self, records):
+        follows = []
+        for record in records:
+            user_id = self.resolve('users', record.get('user'))
+            author_id = self.resolve('users', record.get('author'))
+            if None in (user_id, author_id) or user_id == author_id:
+                continue
+            follows.append(Follow(user_id=user_id, author_id=author_id))
+        # Повторы уже существующих подписок пропускаются базой.
+        Follow.objects.bulk_create(follows, ignore_conflicts=True)
+        return len(follows)
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from posts import timeline
+
+
+class Command(BaseCommand):
+    help = 'Заново раскладывает посты по лентам подписчиков.'
+
+    def handle(self, *args, **options):
+        total = timeline.rebuild()
+        self.stdout.write(self.style.SUCCESS(f'Записей в лентах: {total}'))
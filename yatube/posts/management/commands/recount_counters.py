@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from posts import counters
+from posts.models import Group, Post, User
+
+
+class Command(BaseCommand):
+    help = ('Пересчитывает счётчики постов, комментариев и подписок '
+            'пачками, исправляя расхождения.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size', type=int, default=1000,
+            help='Сколько строк пересчитывать в одной транзакции.'
+        )
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        targets = (
+            ('авторов', User.objects.all(), counters.recount_authors),
+            ('групп', Group.objects.all(), counters.recount_groups),
+            ('постов', Post.objects.all(), counters.recount_posts),
+        )
+        for label, queryset, recount in targets:
+            total = 0
+            for pks in counters.chunked_pks(queryset, chunk_size):
+                recount(pks)
+                total += len(pks)
+            self.stdout.write(f'Пересчитано {label}: {total}')
+        self.stdout.write(self.style.SUCCESS('Счётчики пересчитаны'))
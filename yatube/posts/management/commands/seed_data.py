@@ -0,0 +1,133 @@
+import random
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from faker import Faker
+
+from posts.bulk import batched, manual_dates, rebuild_derived
+from posts.models import Comment, Follow, Group, Post, User
+
+USERNAME_PREFIX = 'bench'
+
+
+class Command(BaseCommand):
+    help = ('Наполняет базу синтетическими данными для бенчмарков: '
+            'авторы со степенным распределением постов, граф подписок '
+            'и комментарии.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--groups', type=int, default=20)
+        parser.add_argument('--posts', type=int, default=20000)
+        parser.add_argument(
+            '--follows', type=int, default=20,
+            help='Сколько авторов в среднем читает пользователь.'
+        )
+        parser.add_argument('--comments', type=int, default=50000)
+        parser.add_argument(
+            '--alpha', type=float, default=1.2,
+            help='Параметр распределения Парето: чем меньше, тем сильнее '
+                 'перекос в сторону популярных авторов.'
+        )
+        parser.add_argument('--days', type=int, default=365)
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        self.random = random.Random(options['seed'])
+        self.faker = Faker('ru_RU')
+        self.faker.seed_instance(options['seed'])
+        self.batch_size = options['batch_size']
+        self.now = timezone.now()
+        self.period = timedelta(days=options['days']).total_seconds()
+
+        users = self.create_users(options['users'])
+        groups = self.create_groups(options['groups'])
+        # Вес пользователя задаёт и число его постов, и число подписчиков.
+        weights = [self.random.paretovariate(options['alpha'])
+                   for _ in users]
+        posts = self.create_posts(users, weights, groups, options['posts'])
+        self.create_follows(users, weights, options['follows'])
+        self.create_comments(users, posts, options['comments'])
+
+        rebuild_derived(self.stdout, self.batch_size)
+        self.stdout.write(self.style.SUCCESS('Данные для бенчмарка созданы'))
+
+    def random_date(self):
+        return self.now - timedelta(
+            seconds=self.random.uniform(0, self.period))
+
+    def create(self, model, objects):
+        # Размер пачки внутри bulk_create Django ограничит сам под лимиты
+        # СУБД, здесь же ограничиваем число объектов в памяти.
+        total = 0
+        for batch in batched(objects, self.batch_size):
+            total += len(model.objects.bulk_create(batch))
+        self.stdout.write(f'{model._meta.verbose_name_plural}: {total}')
+
+    def create_users(self, count):
+        start = User.objects.count()
+        password = make_password(None)
+        self.create(User, (
+            User(username=f'{USERNAME_PREFIX}{start + i}',
+                 first_name=self.faker.first_name(),
+                 last_name=self.faker.last_name(),
+                 password=password)
+            for i in range(count)
+        ))
+        # На SQLite bulk_create не возвращает pk, перечитываем.
+        return list(User.objects.filter(
+            username__startswith=USERNAME_PREFIX).order_by('pk'))
+
+    def create_groups(self, count):
+        start = Group.objects.count()
+        self.create(Group, (
+            Group(title=self.faker.catch_phrase()[:200],
+                  slug=f'{USERNAME_PREFIX}-{start + i}',
+                  description=self.faker.paragraph())
+            for i in range(count)
+        ))
+        return list(Group.objects.filter(
+            slug__startswith=f'{USERNAME_PREFIX}-').order_by('pk'))
+
+    def create_posts(self, users, weights, groups, count):
+        authors = self.random.choices(users, weights, k=count)
+        with manual_dates(Post._meta.get_field('pub_date')):
+            self.create(Post, (
+                Post(text=self.faker.text(max_nb_chars=600),
+                     author=author,
+                     group=(self.random.choice(groups)
+                            if groups and self.random.random() < 0.7
+                            else None),
+                     pub_date=self.random_date())
+                for author in authors
+            ))
+        return list(Post.objects.values_list('pk', flat=True))
+
+    def create_follows(self, users, weights, per_user):
+        follows = []
+        for user in users:
+            wanted = min(len(users) - 1,
+                         int(self.random.expovariate(1 / per_user)))
+            authors = set(self.random.choices(users, weights, k=wanted))
+            authors.discard(user)
+            follows.extend(Follow(user=user, author=author)
+                           for author in authors)
+        self.create(Follow, follows)
+
+    def create_comments(self, users, post_ids, count):
+        if not post_ids:
+            return
+        # Обсуждения тоже распределены неравномерно.
+        weights = [self.random.paretovariate(1.5) for _ in post_ids]
+        targets = self.random.choices(post_ids, weights, k=count)
+        with manual_dates(Comment._meta.get_field('created')):
+            self.create(Comment, (
+                Comment(post_id=post_id,
+                        author=self.random.choice(users),
+                        text=self.faker.sentence(nb_words=12),
+                        created=self.random_date())
+                for post_id in targets
+            ))
@@ -0,0 +1,123 @@
+import base64
+import binascii
+import json
+
+from django.core.paginator import Paginator
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+PAGE_PARAM = 'page'
+CURSOR_PARAM = 'cursor'
+
+
+def encode_cursor(key, backwards=False):
+    raw = json.dumps([backwards, *key], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    """Возвращает (key, backwards) или None для битого курсора."""
+    if not token:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        backwards, *key = json.loads(raw.decode())
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError):
+        return None
+    if not isinstance(backwards, bool) or not key:
+        return None
+    return key, backwards
+
+
+def keyset(queryset, key, backwards, fields=('pub_date', 'pk')):
+    """Упорядочивает queryset по (дата, id) и отрезает всё до ключа."""
+    date_field, pk_field = fields
+    queryset = queryset.order_by(f'-{date_field}', f'-{pk_field}')
+    if key is not None:
+        pub_date, pk = key
+        lookup = 'gt' if backwards else 'lt'
+        queryset = queryset.filter(
+            Q(**{f'{date_field}__{lookup}': pub_date})
+            | Q(**{date_field: pub_date, f'{pk_field}__{lookup}': pk})
+        )
+    return queryset.reverse() if backwards else queryset
+
+
+class CursorPaginator(Paginator):
+    """Keyset-пагинация по (pub_date, id) без COUNT(*) и OFFSET.
+
+    Страница выбирается по индексу pub_date: берём per_page + 1 строк
+    после (или до) ключа последнего показанного поста. Номера страниц
+    неизвестны, поэтому вместо них шаблон получает next_cursor и
+    previous_cursor.
+    """
+    is_cursor = True
+    key_fields = ('pub_date', 'pk')
+
+    def __init__(self, object_list, per_page, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.next_cursor = None
+        self.previous_cursor = None
+
+    def get_key(self, obj):
+        date_field, pk_field = self.key_fields
+        if isinstance(obj, dict):
+            # Строка .values(): поля ключа должны быть в проекции.
+            return [obj[date_field].isoformat(), obj[pk_field]]
+        return [getattr(obj, date_field).isoformat(), obj.pk]
+
+    def parse_key(self, key):
+        pub_date, pk = key
+        pub_date = parse_datetime(pub_date)
+        if pub_date is None:
+            raise ValueError('Invalid cursor date')
+        return pub_date, int(pk)
+
+    def get_window(self, key, backwards, limit):
+        """Возвращает до limit объектов за ключом в порядке обхода."""
+        return list(
+            keyset(self.object_list, key, backwards, self.key_fields)[:limit]
+        )
+
+    def get_page(self, cursor):
+        key, backwards = None, False
+        decoded = decode_cursor(cursor)
+        if decoded is not None:
+            try:
+                key, backwards = self.parse_key(decoded[0]), decoded[1]
+            except (ValueError, TypeError):
+                key, backwards = None, False
+        items = self.get_window(key, backwards, self.per_page + 1)
+        has_more = len(items) > self.per_page
+        if backwards and not has_more:
+            # Дошли до начала ленты: отдаём полную первую страницу.
+            key, backwards = None, False
+            items = self.get_window(None, False, self.per_page + 1)
+            has_more = len(items) > self.per_page
+        items = items[:self.per_page]
+        if backwards:
+            items.reverse()
+            has_next, has_previous = True, True
+        else:
+            has_next, has_previous = has_more, key is not None
+        if items and has_next:
+            self.next_cursor = encode_cursor(self.get_key(items[-1]))
+        if items and has_previous:
+            self.previous_cursor = encode_cursor(
+                self.get_key(items[0]), backwards=True)
+        return self._get_page(items, 1, self)
+
+
+class CommentPaginator(CursorPaginator):
+    """Курсорная пагинация комментариев по (created, id)."""
+    key_fields = ('created', 'pk')
+
+
+def paginate(request, queryset, per_page, paginator_class=CursorPaginator,
+             **kwargs):
+    """Страница ленты: ?page=N для старых ссылок, иначе курсор."""
+    page_number = request.GET.get(PAGE_PARAM)
+    if page_number is not None:
+        return Paginator(queryset, per_page).get_page(page_number)
+    paginator = paginator_class(queryset, per_page, **kwargs)
+    return paginator.get_page(request.GET.get(CURSOR_PARAM))
@@ -0,0 +1,150 @@
+"""Рекомендации «на кого подписаться».
+
+Подписки выгружаются в разреженную матрицу смежности A: строка на
+подписчика со множеством его авторов. Оценка кандидата b для
+пользователя u складывается из двух частей:
+
+- друзья друзей — сколько авторов из подписок u сами подписаны на b,
+  то есть элемент (u, b) произведения A·A;
+- общие группы — b пишет в те же группы, что и авторы из подписок u
+  или сам u ((A + I)·P·Pᵀ, где P — матрица «автор × группа»); вклад
+  группы делится на число её авторов, чтобы большие группы не забивали
+  выдачу.
+
+Строки считаются пачками пользователей, и для каждой пачки старые
+рекомендации заменяются top-N новыми в одной транзакции. Кому не
+хватило кандидатов (ни на кого не подписан и не пишет в группы),
+список добирается самыми читаемыми авторами с отрицательной оценкой,
+ниже посчитанных. Новый пользователь сразу получает такой список при
+регистрации (signals.py). Поэтому для чтения на follow_index хватает
+одного запроса по индексу (user, -score), а хранится больше, чем
+показывается, чтобы выдача не пустела после подписок.
+"""
+import heapq
+from collections import Counter, defaultdict
+from itertools import chain
+
+from django.db import transaction
+
+from .bulk import batched
+from .models import AuthorStats, Follow, Post, Recommendation, User
+
+TOP_N = 10
+CHUNK_SIZE = 500
+FRIENDS_WEIGHT = 1.0
+GROUPS_WEIGHT = 0.5
+
+
+def load_following(chunk_size=CHUNK_SIZE):
+    """Строки A: {подписчик: множество авторов}."""
+    following = defaultdict(set)
+    rows = Follow.objects.values_list('user_id', 'author_id')
+    for user_id, author_id in rows.iterator(chunk_size):
+        following[user_id].add(author_id)
+    return following
+
+
+def load_groups(chunk_size=CHUNK_SIZE):
+    """P по строкам и по столбцам: группы автора и авторы группы."""
+    author_groups = defaultdict(set)
+    group_authors = defaultdict(set)
+    rows = Post.objects.filter(group__isnull=False).order_by().values_list(
+        'author_id', 'group_id').distinct()
+    for author_id, group_id in rows.iterator(chunk_size):
+        author_groups[author_id].add(group_id)
+        group_authors[group_id].add(author_id)
+    return author_groups, group_authors
+
+
+def score(user_id, following, author_groups, group_authors):
+    """Строка оценок кандидатов для user_id: Counter {автор: оценка}."""
+    followed = following.get(user_id, ())
+    friends = Counter(chain.from_iterable(
+        following.get(author_id, ()) for author_id in followed))
+    groups = Counter(chain.from_iterable(
+        author_groups.get(author_id, ()) for author_id in followed))
+    # Свои группы тоже говорят об интересах, даже без подписок.
+    groups.update(author_groups.get(user_id, ()))
+    scores = Counter({author_id: FRIENDS_WEIGHT * count
+                      for author_id, count in friends.items()})
+    for group_id, count in groups.items():
+        authors = group_authors[group_id]
+        weight = GROUPS_WEIGHT * count / len(authors)
+        for author_id in authors:
+            scores[author_id] += weight
+    scores.pop(user_id, None)
+    for author_id in followed:
+        scores.pop(author_id, None)
+    return scores
+
+
+def top(scores, n):
+    # При равных оценках выше автор с меньшим id: выдача стабильна.
+    return heapq.nlargest(n, scores.items(),
+                          key=lambda item: (item[1], -item[0]))
+
+
+def load_popular(limit):
+    """Самые читаемые авторы по убыванию числа подписчиков."""
+    return list(
+        AuthorStats.objects.filter(followers_count__gt=0)
+        .order_by('-followers_count', '-user_id')
+        .values_list('user_id', flat=True)[:limit]
+    )
+
+
+def fill(best, popular, excluded, n):
+    """Добирает best до n читаемыми авторами не из excluded."""
+    chosen = {author_id for author_id, value in best} | set(excluded)
+    for author_id in popular:
+        if len(best) >= n:
+            break
+        if author_id not in chosen:
+            # Отрицательная оценка: ниже посчитанных, по популярности.
+            best.append((author_id, -1.0 - len(best)))
+    return best
+
+
+def rebuild(top_n=TOP_N, chunk_size=CHUNK_SIZE):
+    """Пересчитывает рекомендации всех пользователей, возвращает их число."""
+    following = load_following(chunk_size)
+    author_groups, group_authors = load_groups(chunk_size)
+    # Хватит, даже если пользователь подписан на всех самых читаемых.
+    popular = load_popular(
+        top_n + max(map(len, following.values()), default=0) + 1)
+    user_ids = User.objects.order_by('pk').values_list('pk', flat=True)
+    total = 0
+    for chunk in batched(user_ids.iterator(chunk_size), chunk_size):
+        recommendations = [
+            Recommendation(user_id=user_id, author_id=author_id,
+                           score=value)
+            for user_id in chunk
+            for author_id, value in fill(
+                top(score(user_id, following, author_groups,
+                          group_authors), top_n),
+                popular, following.get(user_id, set()) | {user_id}, top_n)
+        ]
+        with transaction.atomic():
+            Recommendation.objects.filter(user_id__in=chunk).delete()
+            Recommendation.objects.bulk_create(recommendations)
+        total += len(recommendations)
+    return total
+
+
+def seed(user_id, top_n=TOP_N):
+    """Рекомендации нового пользователя: самые читаемые авторы."""
+    Recommendation.objects.bulk_create(
+        Recommendation(user_id=user_id, author_id=author_id, score=value)
+        for author_id, value in fill([], load_popular(top_n + 1),
+                                     {user_id}, top_n)
+    )
+
+
+def for_user(user, limit=TOP_N):
+    """Рекомендации пользователю без тех, на кого он уже подписался."""
+    return list(
+        Recommendation.objects.filter(user_id=user.pk)
+        .exclude(author_id__in=Follow.objects.filter(
+            user_id=user.pk).values('author_id'))
+        .select_related('author')[:limit]
+    )
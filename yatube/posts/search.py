@@ -0,0 +1,141 @@
+"""Полнотекстовый поиск по постам на SQLite FTS5.
+
+Таблица posts_post_fts хранит копию Post.text с rowid = id поста и
+обновляется сигналами при сохранении и удалении поста. На других СУБД
+поиск откатывается к icontains.
+"""
+from django.db import connection
+from django.db.models.expressions import RawSQL
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from .models import Post
+from .paginators import CursorPaginator
+
+FTS_TABLE = 'posts_post_fts'
+MARK_START = '\x02'
+MARK_END = '\x03'
+SNIPPET_TOKENS = 48
+
+
+def is_available():
+    return connection.vendor == 'sqlite'
+
+
+def build_match(query):
+    """Превращает ввод пользователя в безопасный запрос MATCH.
+
+    Каждое слово берётся в кавычки и ищется как префикс, слова
+    объединяются через AND.
+    """
+    return ' '.join(
+        '"{}"*'.format(word.replace('"', '""')) for word in query.split()
+    )
+
+
+def index_post(post):
+    if not is_available():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [post.pk])
+        cursor.execute(
+            f'INSERT INTO {FTS_TABLE}(rowid, text) VALUES (%s, %s)',
+            [post.pk, post.text]
+        )
+
+
+def unindex_post(post_id):
+    if not is_available():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [post_id])
+
+
+def rebuild():
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE}')
+        cursor.execute(
+            f'INSERT INTO {FTS_TABLE}(rowid, text) '
+            f'SELECT id, text FROM {Post._meta.db_table}'
+        )
+        cursor.execute(f'SELECT count(*) FROM {FTS_TABLE}')
+        return cursor.fetchone()[0]
+
+
+def search_queryset(query, queryset=None):
+    """Посты, подходящие под запрос, без ранжирования."""
+    if queryset is None:
+        queryset = Post.objects.all()
+    if not is_available():
+        return queryset.filter(text__icontains=query)
+    return queryset.filter(pk__in=RawSQL(
+        f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s',
+        [build_match(query)]
+    ))
+
+
+def highlight(snippet):
+    return mark_safe(
+        escape(snippet)
+        .replace(MARK_START, '<mark>')
+        .replace(MARK_END, '</mark>')
+    )
+
+
+class SearchPaginator(CursorPaginator):
+    """Курсорная пагинация результатов поиска по (rank, id).
+
+    rank — bm25 из FTS5: чем меньше, тем релевантнее. Каждому посту
+    страницы добавляется атрибут snippet с подсвеченными совпадениями.
+    """
+
+    def __init__(self, object_list, per_page, query, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.query = query
+
+    def get_key(self, obj):
+        if not is_available():
+            return super().get_key(obj)
+        return [obj.rank, obj.pk]
+
+    def parse_key(self, key):
+        if not is_available():
+            return super().parse_key(key)
+        rank, pk = key
+        return float(rank), int(pk)
+
+    def get_window(self, key, backwards, limit):
+        if not is_available():
+            posts = super().get_window(key, backwards, limit)
+            for post in posts:
+                post.snippet = post.text
+            return posts
+        sql = (
+            f'SELECT rowid, rank, snippet({FTS_TABLE}, 0, %s, %s, %s, %s) '
+            f'FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s'
+        )
+        params = [MARK_START, MARK_END, '…', SNIPPET_TOKENS,
+                  build_match(self.query)]
+        if key is not None:
+            rank, pk = key
+            sign = '<' if backwards else '>'
+            sql += f' AND (rank {sign} %s OR (rank = %s AND rowid {sign} %s))'
+            params += [rank, rank, pk]
+        order = 'DESC' if backwards else 'ASC'
+        sql += f' ORDER BY rank {order}, rowid {order} LIMIT %s'
+        params.append(limit)
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            rows = cursor.fetchall()
+        posts = Post.objects.select_related('author', 'group').in_bulk(
+            [row[0] for row in rows]
+        )
+        window = []
+        for post_id, rank, snippet in rows:
+            if post_id in posts:
+                post = posts[post_id]
+                post.rank = rank
+                post.snippet = highlight(snippet)
+                window.append(post)
+        return window
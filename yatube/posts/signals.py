@@ -0,0 +1,165 @@
+from django.db.models import Q
+from django.db.models.signals import (post_delete, post_save, pre_delete,
+                                      pre_save)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from core import storage, thumbnails
+from . import (counters, feed_cache, follow_graph, recommendations,
+               search, timeline, trending)
+from .models import Comment, Follow, Group, Post, User
+
+# Поля пользователя, которые видны в карточках постов.
+NAME_FIELDS = ('username', 'first_name', 'last_name')
+
+
+def is_new_upload(image):
+    return bool(image) and not image._committed
+
+
+@receiver(pre_save, sender=Comment)
+def comment_changing(sender, instance, **kwargs):
+    instance._image_uploaded = is_new_upload(instance.image)
+
+
+@receiver(pre_save, sender=Post)
+def post_changing(sender, instance, **kwargs):
+    instance._image_uploaded = is_new_upload(instance.image)
+    instance._old_group_id = instance._old_image = None
+    if instance._state.adding and not instance.trending_score:
+        instance.trending_score = trending.NEW_POST_WEIGHT
+    if instance.pk is not None:
+        old = Post.objects.filter(pk=instance.pk).values_list(
+            'group_id', 'image').first()
+        if old:
+            instance._old_group_id, instance._old_image = old
+
+
+@receiver(post_save, sender=Post)
+def post_saved(sender, instance, created, **kwargs):
+    if created:
+        counters.bump_author(instance.author_id, posts_count=1)
+        if instance.group_id:
+            counters.bump(Group, instance.group_id, posts_count=1)
+        timeline.fan_out(instance)
+    elif instance._old_group_id != instance.group_id:
+        if instance._old_group_id:
+            counters.bump(Group, instance._old_group_id, posts_count=-1)
+        if instance.group_id:
+            counters.bump(Group, instance.group_id, posts_count=1)
+    feed_cache.invalidate_post(instance, instance._old_group_id)
+    search.index_post(instance)
+    # Повторная загрузка того же файла тоже добавила ссылку.
+    if instance._old_image and (instance._old_image != instance.image.name
+                                or instance._image_uploaded):
+        storage.release(instance.image.storage, instance._old_image)
+    if instance._image_uploaded:
+        thumbnails.enqueue(instance.image)
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted(sender, instance, **kwargs):
+    counters.bump_author(instance.author_id, posts_count=-1)
+    if instance.group_id:
+        counters.bump(Group, instance.group_id, posts_count=-1)
+    feed_cache.invalidate_post(instance)
+    search.unindex_post(instance.pk)
+    storage.release(instance.image.storage, instance.image.name)
+
+
+def touch_posts(**lookups):
+    # Карточки показывают автора и группу: новое время изменения даёт
+    # карточкам постов новый ключ в кеше фрагментов.
+    Post.objects.filter(**lookups).update(modified=timezone.now())
+
+
+@receiver(post_save, sender=Group)
+@receiver(pre_delete, sender=Group)
+def group_changed(sender, instance, **kwargs):
+    # До удаления: после него посты уже отвязаны от группы.
+    touch_posts(group_id=instance.pk)
+    feed_cache.invalidate_group(instance.pk)
+
+
+@receiver(pre_save, sender=User)
+def user_changing(sender, instance, update_fields=None, **kwargs):
+    instance._old_names = None
+    if instance.pk is None or (
+            update_fields is not None
+            and not set(update_fields) & set(NAME_FIELDS)):
+        # Вход обновляет только last_login.
+        return
+    instance._old_names = User.objects.filter(
+        pk=instance.pk).values_list(*NAME_FIELDS).first()
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, created, **kwargs):
+    if created:
+        recommendations.seed(instance.pk)
+    old_names = getattr(instance, '_old_names', None)
+    names = tuple(getattr(instance, field) for field in NAME_FIELDS)
+    if old_names is not None and old_names != names:
+        touch_posts(author_id=instance.pk)
+        feed_cache.invalidate_author(instance.pk)
+
+
+@receiver(post_save, sender=Comment)
+def comment_created(sender, instance, created, **kwargs):
+    if created and instance.post_id:
+        counters.bump(Post, instance.post_id, comments_count=1)
+        trending.bump(instance.post_id, trending.COMMENT_WEIGHT)
+    if instance._image_uploaded:
+        thumbnails.enqueue(instance.image)
+
+
+@receiver(post_delete, sender=Comment)
+def comment_deleted(sender, instance, **kwargs):
+    if instance.post_id:
+        counters.bump(Post, instance.post_id, comments_count=-1)
+        trending.comment_removed(instance)
+        # Удалённый комментарий не оставляет даты для Last-Modified.
+        Post.objects.filter(pk=instance.post_id).update(
+            modified=timezone.now())
+    storage.release(instance.image.storage, instance.image.name)
+
+
+def touch_profiles(follow):
+    # Счётчики подписок видны в профилях обоих пользователей.
+    feed_cache.touch(feed_cache.profile_feed(follow.user_id),
+                     feed_cache.profile_feed(follow.author_id))
+
+
+@receiver(post_save, sender=Follow)
+def follow_created(sender, instance, created, **kwargs):
+    if created:
+        counters.bump_author(instance.user_id, following_count=1)
+        counters.bump_author(instance.author_id, followers_count=1)
+        timeline.backfill(instance.user_id, instance.author_id)
+        follow_graph.invalidate(instance.user_id)
+        touch_profiles(instance)
+
+
+@receiver(post_delete, sender=Follow)
+def follow_deleted(sender, instance, **kwargs):
+    counters.bump_author(instance.user_id, following_count=-1)
+    counters.bump_author(instance.author_id, followers_count=-1)
+    timeline.prune(instance.user_id, instance.author_id)
+    timeline.follower_lost(instance.author_id)
+    follow_graph.invalidate(instance.user_id)
+    touch_profiles(instance)
+
+
+@receiver(thumbnails.thumbnails_ready)
+def thumbnails_generated(sender, name, instance, **kwargs):
+    # Один файл делят все посты и комментарии с той же картинкой, а
+    # сигнал приходит только для instance, поставившего его в очередь.
+    posts = list(Post.objects.filter(
+        Q(image=name) | Q(comments__image=name)
+    ).distinct().only('author_id', 'group_id'))
+    # Карточка с заглушкой вместо картинки устарела: новое время
+    # изменения даёт ей новый ключ в кеше фрагментов.
+    Post.objects.filter(pk__in=[post.pk for post in posts]).update(
+        modified=timezone.now())
+    for post in posts:
+        feed_cache.invalidate_post(post)
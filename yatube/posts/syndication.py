@@ -0,0 +1,148 @@
+"""RSS и Atom для общей ленты, групп и авторов.
+
+Лента строится из проекции .values() последних постов. Готовый XML
+кешируется по тем же валидаторам, что и условный GET (последний
+modified постов, поколение ленты, название группы или имя автора),
+поэтому новый пост и правка сразу дают новый ключ, а опрашивающий
+клиент с актуальным If-None-Match или If-Modified-Since получает 304.
+"""
+import hashlib
+
+from django.conf import settings
+from django.contrib.syndication.views import Feed
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils.feedgenerator import Atom1Feed
+from django.utils.text import Truncator
+
+from core.replicas import replica_reads
+
+from .conditional import (conditional, group_state, index_state,
+                          profile_state, request_state)
+from .models import Group, Post, User
+
+FEED_ITEMS = 20
+TITLE_WORDS = 10
+FEED_KEY = 'syndication:{}'
+ITEM_FIELDS = (
+    'pk', 'text', 'pub_date', 'author__username',
+    'author__first_name', 'author__last_name',
+)
+
+
+class PostsFeed(Feed):
+
+    def get_queryset(self, obj):
+        return Post.objects.all()
+
+    def items(self, obj):
+        return self.get_queryset(obj).values(*ITEM_FIELDS)[:FEED_ITEMS]
+
+    def item_title(self, item):
+        return Truncator(item['text']).words(TITLE_WORDS)
+
+    def item_description(self, item):
+        return item['text']
+
+    def item_link(self, item):
+        return reverse('posts:post_detail', args=[item['pk']])
+
+    def item_pubdate(self, item):
+        return item['pub_date']
+
+    def item_author_name(self, item):
+        full_name = '{} {}'.format(
+            item['author__first_name'], item['author__last_name']).strip()
+        return full_name or item['author__username']
+
+
+class IndexFeed(PostsFeed):
+    title = 'Yatube: последние записи'
+    description = 'Последние обновления на сайте'
+
+    def link(self):
+        return reverse('posts:index')
+
+
+class GroupFeed(PostsFeed):
+
+    def get_object(self, request, slug):
+        return get_object_or_404(Group, slug=slug)
+
+    def get_queryset(self, group):
+        return group.posts.all()
+
+    def title(self, group):
+        return f'Yatube: {group.title}'
+
+    def description(self, group):
+        return group.description
+
+    def link(self, group):
+        return reverse('posts:group_list', args=[group.slug])
+
+
+class ProfileFeed(PostsFeed):
+
+    def get_object(self, request, username):
+        return get_object_or_404(User, username=username)
+
+    def get_queryset(self, author):
+        return author.posts.all()
+
+    def title(self, author):
+        return f'Yatube: {author.get_full_name() or author.username}'
+
+    def description(self, author):
+        return f'Записи пользователя {author.username}'
+
+    def link(self, author):
+        return reverse('posts:profile', args=[author.username])
+
+
+class AtomMixin:
+    feed_type = Atom1Feed
+
+    def subtitle(self, obj):
+        return self._get_dynamic_attr('description', obj)
+
+
+def feed_view(feed, get_state):
+    """Представление ленты с кешем XML и условным GET."""
+    def view(request, *args, **kwargs):
+        state = request_state(request, get_state, *args, **kwargs)
+        if state is None:
+            return feed(request, *args, **kwargs)
+        key = FEED_KEY.format(hashlib.md5(repr(
+            (request.build_absolute_uri(), state.parts)).encode()).hexdigest())
+
+        def render():
+            response = feed(request, *args, **kwargs)
+            return response['Content-Type'], response.content
+
+        content_type, content = cache.get_or_set(
+            key, render, settings.FEED_CACHE_TIMEOUT)
+        return HttpResponse(content, content_type=content_type)
+    return replica_reads(conditional(get_state)(view))
+
+
+class IndexAtomFeed(AtomMixin, IndexFeed):
+    pass
+
+
+class GroupAtomFeed(AtomMixin, GroupFeed):
+    pass
+
+
+class ProfileAtomFeed(AtomMixin, ProfileFeed):
+    pass
+
+
+index_rss = feed_view(IndexFeed(), index_state)
+index_atom = feed_view(IndexAtomFeed(), index_state)
+group_rss = feed_view(GroupFeed(), group_state)
+group_atom = feed_view(GroupAtomFeed(), group_state)
+profile_rss = feed_view(ProfileFeed(), profile_state)
+profile_atom = feed_view(ProfileAtomFeed(), profile_state)
@@ -0,0 +1,14 @@
+from django import template
+
+from posts import fragments
+
+register = template.Library()
+
+
+@register.simple_tag
+def post_cards(posts, template_name):
+    """Карточки постов из кеша фрагментов: [(пост, html)].
+
+    {% post_cards page_obj "posts/includes/post_list.html" as cards %}
+    """
+    return fragments.render_cards(posts, template_name)
@@ -6,6 +6,7 @@ POST_EDIT_URL_NAME = 'posts:post_edit'
 POST_CREATE_URL_NAME = 'posts:create_post'
 FOLLOW_INDEX_URL_NAME = 'posts:follow_index'
 POST_ADD_COMMENT = 'posts:add_comment'
+POST_COMMENTS_URL_NAME = 'posts:post_comments'
 
 POST_ADD_COMMENT_TEMPLATE = 'posts/post_detail.html'
 INDEX_TEMPLATE = 'posts/index.html'
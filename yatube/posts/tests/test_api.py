@@ -0,0 +1,104 @@
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Comment, Follow, Group, Post
+
+User = get_user_model()
+API_INDEX_URL_NAME = 'posts:api_index'
+API_GROUP_LIST_URL_NAME = 'posts:api_group_list'
+API_PROFILE_URL_NAME = 'posts:api_profile'
+API_POST_DETAIL_URL_NAME = 'posts:api_post_detail'
+API_FOLLOW_INDEX_URL_NAME = 'posts:api_follow_index'
+
+
+class ApiTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='NAY')
+        cls.author = User.objects.create_user(username='author')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        for i in range(13):
+            Post.objects.create(author=cls.author, group=cls.group,
+                                text=f'Пост {i}')
+        cls.post = Post.objects.latest('pub_date', 'pk')
+        Comment.objects.create(post=cls.post, author=cls.user, text='Ответ')
+        Follow.objects.create(user=cls.user, author=cls.author)
+
+    def setUp(self):
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def test_feeds_paginate_with_cursor(self):
+        """Ленты API листаются курсором без повторов и пропусков."""
+        urls = (
+            reverse(API_INDEX_URL_NAME),
+            reverse(API_GROUP_LIST_URL_NAME, args=[self.group.slug]),
+            reverse(API_PROFILE_URL_NAME, args=[self.author.username]),
+            reverse(API_FOLLOW_INDEX_URL_NAME),
+        )
+        expected = list(Post.objects.values_list('id', flat=True))
+        for url in urls:
+            with self.subTest(url=url):
+                first = self.authorized_client.get(url).json()
+                second = self.authorized_client.get(
+                    url, {'cursor': first['next']}).json()
+                ids = [post['id']
+                       for post in first['results'] + second['results']]
+                self.assertEqual(ids, expected)
+                self.assertIsNone(second['next'])
+
+    def test_sparse_fields(self):
+        """fields ограничивает и поля ответа, и выбираемые колонки."""
+        with self.assertNumQueries(1):
+            response = self.client.get(
+                reverse(API_INDEX_URL_NAME), {'fields': 'id,author'})
+        self.assertEqual(
+            response.json()['results'][0],
+            {'id': self.post.id, 'author': self.author.username},
+        )
+        response = self.client.get(
+            reverse(API_INDEX_URL_NAME), {'fields': 'id,password'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_post_detail(self):
+        """Пост отдаётся вместе с первой страницей комментариев."""
+        data = self.client.get(
+            reverse(API_POST_DETAIL_URL_NAME, args=[self.post.id]),
+            {'fields': 'text,comments_count'},
+        ).json()
+        self.assertEqual(data['post'],
+                         {'text': self.post.text, 'comments_count': 1})
+        self.assertEqual([comment['text'] for comment in data['comments']],
+                         ['Ответ'])
+
+    def test_profile_and_group_metadata(self):
+        """Профиль и группа отдают свои данные и счётчики."""
+        author = self.client.get(
+            reverse(API_PROFILE_URL_NAME, args=[self.author.username])
+        ).json()['author']
+        self.assertEqual(author['posts_count'], 13)
+        self.assertEqual(author['followers_count'], 1)
+        group = self.client.get(
+            reverse(API_GROUP_LIST_URL_NAME, args=[self.group.slug])
+        ).json()['group']
+        self.assertEqual(group['slug'], self.group.slug)
+
+    def test_errors(self):
+        """Ошибки приходят в JSON с подходящим статусом."""
+        cases = (
+            (reverse(API_PROFILE_URL_NAME, args=['nobody']), 404),
+            (reverse(API_POST_DETAIL_URL_NAME, args=[0]), 404),
+            (reverse(API_FOLLOW_INDEX_URL_NAME), 401),
+        )
+        for url, status in cases:
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, status)
+                self.assertIn('error', response.json())
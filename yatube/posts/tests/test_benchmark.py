@@ -0,0 +1,67 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from core.querystats import QueryStats
+from posts import urls
+from posts.models import AuthorStats, Comment, Follow, Post, TimelineEntry
+
+
+class BenchmarkCommandsTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        call_command('seed_data', users=15, groups=3, posts=60, follows=3,
+                     comments=40, stdout=StringIO())
+
+    def test_seed_data_builds_derived_data(self):
+        """seed_data создаёт данные и пересчитывает производные таблицы."""
+        self.assertEqual(Post.objects.count(), 60)
+        self.assertEqual(Comment.objects.count(), 40)
+        self.assertEqual(
+            sum(AuthorStats.objects.values_list('posts_count', flat=True)),
+            60,
+        )
+        follow = Follow.objects.first()
+        self.assertEqual(
+            TimelineEntry.objects.filter(user=follow.user,
+                                         author=follow.author).count(),
+            Post.objects.filter(author=follow.author).count(),
+        )
+
+    def test_benchmark_reports_every_url(self):
+        """benchmark замеряет все адреса и сохраняет JSON."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'run.json')
+            call_command('benchmark', iterations=2, warmup=0, json=path,
+                         stdout=StringIO())
+            with open(path) as file:
+                scenarios = json.load(file)['scenarios']
+        self.assertEqual(
+            set(scenarios), {pattern.name for pattern in urls.urlpatterns})
+        for name, result in scenarios.items():
+            with self.subTest(name=name):
+                self.assertLess(result['status'], 500)
+                self.assertLessEqual(result['p50'], result['p99'])
+                self.assertGreater(result['queries'], 0)
+
+    def test_benchmark_rolls_back_writes(self):
+        """Пишущие адреса не меняют базу после прогона."""
+        follows = Follow.objects.count()
+        call_command('benchmark', iterations=1, warmup=0,
+                     only=['profile_follow', 'profile_unfollow'],
+                     stdout=StringIO())
+        self.assertEqual(Follow.objects.count(), follows)
+
+    def test_query_stats_counts_rows(self):
+        """QueryStats считает запросы и прочитанные строки."""
+        with QueryStats() as stats:
+            list(Post.objects.all()[:5])
+            Post.objects.count()
+        self.assertEqual(stats.queries, 2)
+        self.assertEqual(stats.rows, 6)
@@ -0,0 +1,108 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+from django.test import SimpleTestCase
+
+from core.cache import SQLiteCache
+
+
+class SQLiteCacheTests(SimpleTestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'cache.sqlite3')
+        self.cache = self.make_cache()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def make_cache(self):
+        # Отдельный экземпляр на тот же файл ведёт себя как другой воркер.
+        return SQLiteCache(self.path, {
+            'OPTIONS': {'STALE_TIMEOUT': 60, 'LOCK_TIMEOUT': 5,
+                        'POLL_INTERVAL': 0.01},
+        })
+
+    def expire(self, key):
+        self.cache.db.execute('UPDATE cache SET expires = ? WHERE key = ?',
+                              (time.time() - 1, self.cache.make_key(key)))
+
+    def test_basic_operations(self):
+        """set/get/add/incr/delete работают как у встроенных бэкендов."""
+        self.cache.set('key', {'a': 1})
+        self.assertEqual(self.cache.get('key'), {'a': 1})
+        self.assertFalse(self.cache.add('key', 'other'))
+        self.assertTrue(self.cache.add('counter', 1))
+        self.assertEqual(self.cache.incr('counter', 5), 6)
+        with self.assertRaises(ValueError):
+            self.cache.incr('missing')
+        self.cache.delete('key')
+        self.assertIsNone(self.cache.get('key'))
+        self.cache.set('key', 'value', 0)
+        self.assertIsNone(self.cache.get('key'))
+
+    def test_shared_between_instances(self):
+        """Запись одного воркера сразу видна другому."""
+        other = self.make_cache()
+        self.cache.set('feed', 'page')
+        self.assertEqual(other.get('feed'), 'page')
+        self.cache.set('feed:generation', 1)
+        other.incr('feed:generation')
+        self.assertEqual(self.cache.get('feed:generation'), 2)
+
+    def test_stale_value_served_while_recomputing(self):
+        """Истёкший ключ пересчитывает один воркер, другим — старое."""
+        other = self.make_cache()
+        self.cache.set('index', 'old')
+        self.expire('index')
+        self.assertIsNone(self.cache.get('index'))
+        self.assertEqual(other.get('index'), 'old')
+        self.cache.set('index', 'new')
+        self.assertEqual(other.get('index'), 'new')
+
+    def test_get_many_single_query(self):
+        """get_many читает все ключи одним запросом, с учётом устаревших."""
+        other = self.make_cache()
+        self.cache.set_many({'a': 1, 'b': 2, 'c': 3})
+        self.expire('c')
+        statements = []
+        self.cache.db.set_trace_callback(statements.append)
+        self.assertEqual(self.cache.get_many(['a', 'b', 'c', 'd']),
+                         {'a': 1, 'b': 2})
+        self.cache.db.set_trace_callback(None)
+        self.assertEqual(
+            sum(sql.startswith('SELECT') for sql in statements), 1)
+        self.assertEqual(other.get_many(['c']), {'c': 3})
+
+    def test_get_or_set_computes_once(self):
+        """Отсутствующий ключ считается один раз, остальные ждут."""
+        calls = []
+        results = []
+
+        def compute():
+            calls.append(1)
+            time.sleep(0.2)
+            return 'page'
+
+        def worker():
+            results.append(self.make_cache().get_or_set('page', compute))
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, ['page'] * 4)
+
+    def test_failed_compute_releases_lock(self):
+        """Ошибка пересчёта не оставляет ключ заблокированным."""
+        def fail():
+            raise RuntimeError
+
+        with self.assertRaises(RuntimeError):
+            self.cache.get_or_set('page', fail)
+        self.assertEqual(self.make_cache().get_or_set('page', 'ok'), 'ok')
@@ -0,0 +1,164 @@
+from contextlib import contextmanager
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+import posts.tests.constants as ct
+from posts.models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+
+class ConditionalGetTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='NAY')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        cls.post = Post.objects.create(
+            author=cls.user, group=cls.group, text='Тестовый пост')
+
+    def setUp(self):
+        cache.clear()
+        self.urls = (
+            reverse(ct.INDEX_URL_NAME),
+            reverse(ct.GROUP_LIST_URL_NAME, args=[self.group.slug]),
+            reverse(ct.PROFILE_URL_NAME, args=[self.user.username]),
+            reverse(ct.POST_DETAIL_URL_NAME, args=[self.post.pk]),
+        )
+
+    def revalidate(self, url, client=None):
+        client = client or self.client
+        response = client.get(url)
+        return client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+
+    def test_not_modified_without_rendering(self):
+        """Актуальная копия получает 304 за один запрос к базе.
+
+        Просмотр поста уже засчитан первым запросом этого клиента.
+        """
+        for url in self.urls:
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                with self.assertNumQueries(1):
+                    response = self.client.get(
+                        url, HTTP_IF_NONE_MATCH=response['ETag'])
+                self.assertEqual(response.status_code, 304)
+                self.assertEqual(response.content, b'')
+
+    @contextmanager
+    def later(self, minutes):
+        """Изменение через minutes минут: у HTTP-даты точность в секунду."""
+        moment = timezone.now() + timedelta(minutes=minutes)
+        with mock.patch('django.utils.timezone.now', return_value=moment), \
+                mock.patch('time.time', return_value=moment.timestamp()):
+            yield
+
+    def test_if_modified_since(self):
+        """Last-Modified тоже подходит для условного запроса."""
+        for url in self.urls:
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                response = self.client.get(
+                    url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+                self.assertEqual(response.status_code, 304)
+
+    def test_last_modified_follows_changes(self):
+        """Правка, удаление и переименования сдвигают Last-Modified."""
+        extra = Post.objects.create(
+            author=self.user, group=self.group, text='Лишний пост')
+        comment = Comment.objects.create(
+            post=self.post, author=self.user, text='Ответ')
+        post = Post.objects.get(pk=self.post.pk)
+        group = Group.objects.get(pk=self.group.pk)
+        author = User.objects.get(pk=self.user.pk)
+        reader = User.objects.create_user(username='reader')
+
+        def edit():
+            post.text = 'Исправленный текст'
+            post.save()
+
+        def rename_group():
+            group.title = 'Новое название'
+            group.save()
+
+        def rename_author():
+            author.first_name = 'Новое'
+            author.save()
+
+        index, group_list, profile, detail = self.urls
+        changes = (
+            (edit, self.urls),
+            (extra.delete, self.urls),
+            (comment.delete, (detail,)),
+            (rename_group, (index, group_list, profile)),
+            (rename_author, self.urls),
+            (lambda: Follow.objects.create(user=reader, author=author),
+             (profile,)),
+        )
+        for minutes, (change, urls) in enumerate(changes, start=1):
+            since = [self.client.get(url)['Last-Modified'] for url in urls]
+            with self.later(minutes):
+                change()
+            for url, value in zip(urls, since):
+                with self.subTest(change=change.__name__, url=url):
+                    response = self.client.get(
+                        url, HTTP_IF_MODIFIED_SINCE=value)
+                    self.assertEqual(response.status_code, 200)
+
+    def test_names_change_etag(self):
+        """Правка группы и имени автора меняет ETag их страниц."""
+        group_url, profile_url = self.urls[1:3]
+        etags = [self.client.get(url)['ETag'] for url in self.urls[1:3]]
+        Group.objects.filter(pk=self.group.pk).update(title='Новое название')
+        User.objects.filter(pk=self.user.pk).update(last_name='Новая')
+        for url, etag in zip((group_url, profile_url), etags):
+            with self.subTest(url=url):
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 200)
+
+    def test_new_post_changes_feeds(self):
+        """Новый пост делает устаревшими ленты, где он появляется."""
+        etags = [self.client.get(url)['ETag'] for url in self.urls[:3]]
+        Post.objects.create(
+            author=self.user, group=self.group, text='Новый пост')
+        for url, etag in zip(self.urls, etags):
+            with self.subTest(url=url):
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 200)
+
+    def test_post_edit_and_comment_change_detail(self):
+        """Правка поста и новый комментарий меняют ETag страницы поста."""
+        url = self.urls[3]
+        etag = self.client.get(url)['ETag']
+        post = Post.objects.get(pk=self.post.pk)
+        post.text = 'Исправленный текст'
+        post.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertContains(response, 'Исправленный текст')
+        etag = response['ETag']
+        Comment.objects.create(post=post, author=self.user, text='Ответ')
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertContains(response, 'Ответ')
+
+    def test_etag_depends_on_user_and_query(self):
+        """Разные пользователи и страницы получают разные ETag."""
+        url = self.urls[0]
+        authorized_client = Client()
+        authorized_client.force_login(self.user)
+        self.assertNotEqual(self.client.get(url)['ETag'],
+                            authorized_client.get(url)['ETag'])
+        self.assertNotEqual(self.client.get(url)['ETag'],
+                            self.client.get(url, {'page': 1})['ETag'])
+        self.assertEqual(self.revalidate(url, authorized_client).status_code,
+                         304)
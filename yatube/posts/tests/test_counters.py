@@ -0,0 +1,89 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+import posts.tests.constants as ct
+from posts.models import AuthorStats, Group, Post
+
+User = get_user_model()
+
+
+class CountersTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='NAY')
+        cls.author = User.objects.create_user(username='author')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+
+    def setUp(self):
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def test_create_post_updates_author_and_group(self):
+        """Создание поста увеличивает счётчики автора и группы."""
+        self.authorized_client.post(
+            reverse(ct.POST_CREATE_URL_NAME),
+            data={'text': 'Пост', 'group': self.group.id},
+        )
+        self.group.refresh_from_db()
+        self.assertEqual(self.user.stats.posts_count, 1)
+        self.assertEqual(self.group.posts_count, 1)
+
+    def test_edit_group_moves_post_counter(self):
+        """Смена группы поста переносит его между счётчиками групп."""
+        other = Group.objects.create(
+            title='Другая группа', slug='other', description='Описание')
+        post = Post.objects.create(
+            author=self.user, text='Пост', group=self.group)
+        post.group = other
+        post.save()
+        self.group.refresh_from_db()
+        other.refresh_from_db()
+        self.assertEqual(self.group.posts_count, 0)
+        self.assertEqual(other.posts_count, 1)
+
+    def test_add_comment_updates_post(self):
+        """Комментарий увеличивает счётчик комментариев поста."""
+        post = Post.objects.create(author=self.author, text='Пост')
+        self.authorized_client.post(
+            reverse(ct.POST_ADD_COMMENT, kwargs={'post_id': post.id}),
+            data={'text': 'Комментарий'},
+        )
+        post.refresh_from_db()
+        self.assertEqual(post.comments_count, 1)
+
+    def test_follow_and_unfollow_update_stats(self):
+        """Подписка и отписка меняют счётчики обоих пользователей."""
+        url_kwargs = {'username': self.author.username}
+        self.authorized_client.get(
+            reverse('posts:profile_follow', kwargs=url_kwargs))
+        self.assertEqual(
+            AuthorStats.objects.get(user=self.author).followers_count, 1)
+        self.assertEqual(
+            AuthorStats.objects.get(user=self.user).following_count, 1)
+        self.authorized_client.get(
+            reverse('posts:profile_unfollow', kwargs=url_kwargs))
+        self.assertEqual(
+            AuthorStats.objects.get(user=self.author).followers_count, 0)
+        self.assertEqual(
+            AuthorStats.objects.get(user=self.user).following_count, 0)
+
+    def test_recount_command_repairs_drift(self):
+        """Команда recount_counters исправляет разошедшиеся счётчики."""
+        Post.objects.create(author=self.user, text='Пост', group=self.group)
+        AuthorStats.objects.filter(user=self.user).update(posts_count=42)
+        Group.objects.filter(pk=self.group.pk).update(posts_count=42)
+        call_command('recount_counters', chunk_size=1, stdout=StringIO())
+        self.group.refresh_from_db()
+        self.assertEqual(
+            AuthorStats.objects.get(user=self.user).posts_count, 1)
+        self.assertEqual(self.group.posts_count, 1)
@@ -0,0 +1,59 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from posts.models import Group, Post
+
+User = get_user_model()
+GROUP_INDEX_URL_NAME = 'posts:group_index'
+
+
+class GroupDirectoryTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.groups = [
+            Group.objects.create(title=f'Группа {i}', slug=f'group-{i}',
+                                 description='Описание')
+            for i in range(3)
+        ]
+        for i in range(3):
+            cls.latest = Post.objects.create(
+                author=cls.author, group=cls.groups[0], text=f'Пост {i}')
+
+    def setUp(self):
+        cache.clear()
+
+    def get_groups(self):
+        response = self.client.get(reverse(GROUP_INDEX_URL_NAME))
+        return {group['slug']: group for group in response.context['groups']}
+
+    def test_directory_in_one_query(self):
+        """Каталог считается одним запросом и дальше читается из кеша."""
+        with self.assertNumQueries(1):
+            groups = self.get_groups()
+        with self.assertNumQueries(0):
+            self.get_groups()
+        first = groups['group-0']
+        self.assertEqual(first['posts_count'], 3)
+        self.assertEqual(first['latest_id'], self.latest.id)
+        self.assertEqual(first['latest_preview'], self.latest.text)
+        self.assertEqual(first['latest_pub_date'], self.latest.pub_date)
+        self.assertIsNone(groups['group-1']['latest_id'])
+
+    def test_post_changes_invalidate(self):
+        """Новый пост, перенос поста и новая группа видны сразу."""
+        self.get_groups()
+        post = Post.objects.create(
+            author=self.author, group=self.groups[1], text='Новый')
+        self.assertEqual(self.get_groups()['group-1']['latest_id'], post.id)
+        post.group = self.groups[2]
+        post.save()
+        groups = self.get_groups()
+        self.assertEqual(groups['group-1']['posts_count'], 0)
+        self.assertEqual(groups['group-2']['latest_id'], post.id)
+        Group.objects.create(title='Ещё', slug='more', description='')
+        self.assertIn('more', self.get_groups())
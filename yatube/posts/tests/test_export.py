@@ -0,0 +1,86 @@
+import csv
+import io
+import json
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Group, Post
+
+User = get_user_model()
+PROFILE_EXPORT_URL_NAME = 'posts:profile_export'
+GROUP_EXPORT_URL_NAME = 'posts:group_export'
+
+
+class ExportTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.moderator = User.objects.create_user(
+            username='moderator', is_staff=True)
+        cls.stranger = User.objects.create_user(username='stranger')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        for i in range(5):
+            Post.objects.create(author=cls.author, group=cls.group,
+                                text=f'Пост, с "кавычками"\nи строкой {i}')
+
+    def get_client(self, user):
+        client = Client()
+        client.force_login(user)
+        return client
+
+    def read(self, response):
+        return b''.join(response.streaming_content).decode()
+
+    def test_profile_export_csv(self):
+        """Автор получает свои посты потоковым CSV."""
+        response = self.get_client(self.author).get(
+            reverse(PROFILE_EXPORT_URL_NAME, args=[self.author.username]))
+        self.assertTrue(response.streaming)
+        self.assertIn('attachment', response['Content-Disposition'])
+        rows = list(csv.DictReader(io.StringIO(self.read(response))))
+        self.assertEqual(len(rows), 5)
+        self.assertEqual(rows[0]['author'], self.author.username)
+        self.assertEqual(rows[0]['text'], Post.objects.first().text)
+
+    def test_group_export_jsonl(self):
+        """Модератор выгружает группу в JSONL, строка на пост."""
+        response = self.get_client(self.moderator).get(
+            reverse(GROUP_EXPORT_URL_NAME, args=[self.group.slug]),
+            {'format': 'jsonl'},
+        )
+        rows = [json.loads(line)
+                for line in self.read(response).splitlines()]
+        self.assertEqual([row['id'] for row in rows],
+                         list(Post.objects.values_list('id', flat=True)))
+        self.assertEqual(rows[0]['group'], self.group.slug)
+
+    def test_export_permissions(self):
+        """Чужой профиль и группы выгружать нельзя."""
+        client = self.get_client(self.stranger)
+        urls = (
+            reverse(PROFILE_EXPORT_URL_NAME, args=[self.author.username]),
+            reverse(GROUP_EXPORT_URL_NAME, args=[self.group.slug]),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                self.assertEqual(client.get(url).status_code, 403)
+        response = self.get_client(self.author).get(
+            urls[0], {'format': 'xml'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_export_command(self):
+        """Команда export_posts пишет ту же выгрузку в stdout."""
+        output = StringIO()
+        call_command('export_posts', author=self.author.username,
+                     format='jsonl', chunk_size=2, stdout=output)
+        self.assertEqual(len(output.getvalue().splitlines()), 5)
@@ -0,0 +1,63 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+import posts.tests.constants as ct
+from posts import follow_graph
+from posts.models import Follow, Post
+
+User = get_user_model()
+
+
+class FollowGraphTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.reader = User.objects.create_user(username='reader')
+        cls.authors = [User.objects.create_user(username=f'author{i}')
+                       for i in range(3)]
+        cls.fan = User.objects.create_user(username='fan')
+        Follow.objects.create(user=cls.reader, author=cls.authors[0])
+        Follow.objects.create(user=cls.fan, author=cls.authors[1])
+        for author in cls.authors:
+            Post.objects.create(author=author, text=f'Пост {author}')
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.reader)
+
+    def test_one_query_per_viewer(self):
+        """Подписки читаются одним запросом, дальше из памяти и кеша."""
+        author_ids = [author.id for author in self.authors]
+        with self.assertNumQueries(1):
+            answers = follow_graph.following_map(self.reader, author_ids)
+            follow_graph.is_following(self.reader, author_ids[1])
+        self.assertEqual(answers, dict(zip(author_ids, (True, False, False))))
+        reader = User.objects.get(pk=self.reader.pk)
+        with self.assertNumQueries(0):
+            self.assertTrue(
+                follow_graph.is_following(reader, author_ids[0]))
+
+    def test_follow_and_unfollow_invalidate(self):
+        """Подписка и отписка сразу видны на странице автора."""
+        author = self.authors[1]
+        url = reverse(ct.PROFILE_URL_NAME, args=[author.username])
+        # Подписка другого пользователя не считается подпиской зрителя.
+        self.assertFalse(self.client.get(url).context['following'])
+        self.client.get(
+            reverse('posts:profile_follow', args=[author.username]))
+        self.assertTrue(self.client.get(url).context['following'])
+        self.client.get(
+            reverse('posts:profile_unfollow', args=[author.username]))
+        self.assertFalse(self.client.get(url).context['following'])
+
+    def test_api_following_field(self):
+        """API отмечает посты авторов, на которых подписан зритель."""
+        response = self.client.get(reverse('posts:api_index'),
+                                   {'fields': 'author,following'})
+        following = {row['author']: row['following']
+                     for row in response.json()['results']}
+        self.assertEqual(following, {'author0': True, 'author1': False,
+                                     'author2': False})
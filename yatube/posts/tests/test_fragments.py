@@ -0,0 +1,112 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+import posts.tests.constants as ct
+from core import thumbnails
+from posts import fragments
+from posts.models import Comment, Follow, Group, Post
+
+User = get_user_model()
+POST_CARD_TEMPLATE = 'posts/includes/post_list.html'
+
+
+class FragmentCacheTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+        Follow.objects.create(user=cls.reader, author=cls.author)
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        for i in range(3):
+            Post.objects.create(author=cls.author, group=cls.group,
+                                text=f'Пост {i}')
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.reader)
+        self.urls = (
+            reverse(ct.INDEX_URL_NAME),
+            reverse(ct.GROUP_LIST_URL_NAME, args=[self.group.slug]),
+            reverse(ct.FOLLOW_INDEX_URL_NAME),
+        )
+
+    def count_renders(self, url):
+        with mock.patch('posts.fragments.render_to_string',
+                        wraps=fragments.render_to_string) as render:
+            response = self.client.get(url)
+        return response, render.call_count
+
+    def test_cards_reused_after_new_post(self):
+        """Новый пост не перерисовывает карточки, оставшиеся на месте."""
+        for url in self.urls:
+            with self.subTest(url=url):
+                self.count_renders(url)
+        Post.objects.create(author=self.author, group=self.group,
+                            text='Новый пост')
+        # Новая карточка и сдвинутая из первых (без lazy) в ленивые;
+        # лента подписок берёт карточки, уже отрендеренные для главной.
+        for url, expected in zip(self.urls, (2, 2, 0)):
+            with self.subTest(url=url):
+                response, renders = self.count_renders(url)
+                self.assertContains(response, 'Новый пост')
+                self.assertContains(response, 'Пост 0')
+                self.assertEqual(renders, expected)
+
+    def test_edit_changes_key(self):
+        """Правка поста обновляет время изменения и его карточку."""
+        post = Post.objects.first()
+        self.client.get(self.urls[0])
+        modified = post.modified
+        post.text = 'Исправленный пост'
+        post.save()
+        self.assertGreater(post.modified, modified)
+        response, renders = self.count_renders(self.urls[0])
+        self.assertContains(response, 'Исправленный пост')
+        self.assertEqual(renders, 1)
+
+    def test_rename_refreshes_cards(self):
+        """Новое имя автора и адрес группы видны в карточках сразу."""
+        for url in self.urls:
+            self.client.get(url)
+        author = User.objects.get(pk=self.author.pk)
+        author.first_name, author.last_name = 'Лев', 'Толстой'
+        author.save()
+        group = Group.objects.get(pk=self.group.pk)
+        group.slug = 'new-slug'
+        group.save()
+        for url in (self.urls[0], self.urls[2]):
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertContains(response, 'Лев Толстой')
+                self.assertContains(
+                    response, reverse(ct.GROUP_LIST_URL_NAME,
+                                      args=['new-slug']))
+
+    def test_ready_thumbnail_refreshes_card(self):
+        """Готовая миниатюра заменяет заглушку у всех владельцев файла."""
+        first, second, other = Post.objects.all()
+        Post.objects.filter(pk__in=[first.pk, second.pk]).update(
+            image='posts/small.gif')
+        Comment.objects.create(post=other, author=self.reader, text='Ответ',
+                               image='posts/small.gif')
+        posts = Post.objects.all()
+        keys = [fragments.card_key(POST_CARD_TEMPLATE, post)
+                for post in posts]
+        # Второй пост с тем же файлом в очередь не попадал.
+        thumbnails.thumbnails_ready.send(
+            sender=None, name='posts/small.gif', instance=first)
+        for post, key in zip(posts, keys):
+            with self.subTest(post=post.text):
+                post.refresh_from_db()
+                self.assertNotEqual(
+                    fragments.card_key(POST_CARD_TEMPLATE, post), key)
@@ -0,0 +1,103 @@
+import shutil
+import tempfile
+from io import BytesIO
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+
+import posts.tests.constants as ct
+from posts.models import Comment, Post
+
+User = get_user_model()
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+def make_upload(name, size, image_format, mode='RGB', **save_options):
+    buffer = BytesIO()
+    Image.new(mode, size, 'red').save(buffer, image_format, **save_options)
+    return SimpleUploadedFile(name, buffer.getvalue())
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT, THUMBNAIL_WORKERS=0,
+                   IMAGE_MAX_SIZE=100)
+class ImageIngestTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='NAY')
+        cls.post = Post.objects.create(author=cls.user, text='Тестовый пост')
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def create_post(self, upload):
+        return self.client.post(reverse(ct.POST_CREATE_URL_NAME),
+                                {'text': 'Пост с картинкой', 'image': upload})
+
+    def test_upload_resized_and_stripped(self):
+        """Создание поста сохраняет уменьшенную копию без EXIF."""
+        exif = Image.Exif()
+        exif[0x010F] = 'Camera'
+        self.create_post(
+            make_upload('photo.jpg', (400, 200), 'JPEG', exif=exif))
+        post = Post.objects.get(text='Пост с картинкой')
+        with Image.open(post.image) as image:
+            self.assertEqual(image.format, 'JPEG')
+            self.assertEqual(image.size, (100, 50))
+            self.assertNotIn('exif', image.info)
+
+    def test_format_by_content(self):
+        """Прозрачность сохраняется в PNG, прочее перекодируется в JPEG."""
+        cases = (
+            (make_upload('logo.png', (50, 50), 'PNG', 'RGBA'), 'PNG'),
+            (make_upload('scan.bmp', (50, 50), 'BMP'), 'JPEG'),
+        )
+        for upload, image_format in cases:
+            with self.subTest(name=upload.name):
+                self.create_post(upload)
+                post = Post.objects.exclude(image='').first()
+                with Image.open(post.image) as image:
+                    self.assertEqual(image.format, image_format)
+                post.delete()
+
+    def test_comment_image(self):
+        """Картинка комментария проходит тот же приём."""
+        self.client.post(
+            reverse(ct.POST_ADD_COMMENT, args=[self.post.pk]),
+            {'text': 'Комментарий',
+             'image': make_upload('photo.png', (300, 300), 'PNG')})
+        comment = Comment.objects.get()
+        with Image.open(comment.image) as image:
+            self.assertEqual(image.size, (100, 100))
+
+    @override_settings(IMAGE_MAX_PIXELS=100 * 100, IMAGE_MAX_UPLOAD_SIZE=500)
+    def test_limits(self):
+        """Слишком большие файлы и картинки отклоняются формой."""
+        cases = (
+            make_upload('wide.png', (101, 100), 'PNG'),
+            make_upload('noise.bmp', (20, 20), 'BMP'),
+        )
+        for upload in cases:
+            with self.subTest(name=upload.name):
+                response = self.create_post(upload)
+                self.assertTrue(response.context['form'].errors['image'])
+        self.assertFalse(Post.objects.exclude(image=''))
+
+    def test_truncated_upload(self):
+        """Обрезанный файл — ошибка формы, а не 500."""
+        upload = make_upload('cut.jpg', (300, 300), 'JPEG')
+        upload = SimpleUploadedFile('cut.jpg', upload.read()[:-200])
+        response = self.create_post(upload)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.context['form'].errors['image'])
+        self.assertFalse(Post.objects.exclude(image=''))
@@ -0,0 +1,95 @@
+import csv
+import json
+import os
+import shutil
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from posts.models import Comment, Follow, Group, Post, TimelineEntry
+
+User = get_user_model()
+
+
+class ImportDataTests(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+        User.objects.create_user(username='existing')
+
+    def write_jsonl(self, name, records):
+        path = os.path.join(self.directory, name)
+        with open(path, 'w', encoding='utf-8') as file:
+            for record in records:
+                file.write(json.dumps(record, ensure_ascii=False) + '\n')
+        return path
+
+    def write_csv(self, name, header, rows):
+        path = os.path.join(self.directory, name)
+        with open(path, 'w', encoding='utf-8', newline='') as file:
+            writer = csv.writer(file)
+            writer.writerow(header)
+            writer.writerows(rows)
+        return path
+
+    def import_data(self, **paths):
+        output = StringIO()
+        call_command('import_data', batch_size=2, stdout=output, **paths)
+        return output.getvalue()
+
+    def test_import_resolves_references(self):
+        """Ссылки из источника разрешаются через карту id."""
+        output = self.import_data(
+            users=self.write_jsonl('users.jsonl', [
+                {'id': 10, 'username': 'existing'},
+                {'id': 11, 'username': 'writer'},
+                {'id': 12, 'username': 'reader'},
+            ]),
+            groups=self.write_csv('groups.csv', ['id', 'title', 'slug'],
+                                  [['g1', 'Архив', 'archive']]),
+            posts=self.write_jsonl('posts.jsonl', [
+                {'id': i, 'author': 11, 'group': 'g1' if i % 2 else None,
+                 'text': f'Пост {i}', 'pub_date': f'2019-05-0{i}T12:00:00'}
+                for i in range(1, 6)
+            ]),
+            comments=self.write_csv(
+                'comments.csv', ['post', 'author', 'text'],
+                [[3, 12, 'К третьему'], [99, 12, 'Потерянный']]),
+            follows=self.write_csv('follows.csv', ['user', 'author'],
+                                   [[12, 11], [12, 11], [11, 11]]),
+        )
+        self.assertIn('строк/с', output)
+        self.assertEqual(User.objects.filter(username='existing').count(), 1)
+        writer = User.objects.get(username='writer')
+        self.assertEqual(writer.posts.count(), 5)
+        self.assertEqual(Group.objects.get(slug='archive').posts.count(), 3)
+        comment = Comment.objects.get()
+        self.assertEqual(comment.post.text, 'Пост 3')
+        self.assertEqual(comment.post.pub_date.day, 3)
+        self.assertEqual(Follow.objects.count(), 1)
+
+        # Производные данные пересчитаны после загрузки.
+        self.assertEqual(writer.stats.posts_count, 5)
+        self.assertEqual(writer.stats.followers_count, 1)
+        self.assertEqual(comment.post.comments_count, 1)
+        self.assertEqual(TimelineEntry.objects.count(), 5)
+
+    def test_bad_input(self):
+        """Битые строки и пропущенные поля останавливают загрузку."""
+        broken = os.path.join(self.directory, 'broken.jsonl')
+        with open(broken, 'w') as file:
+            file.write('{"id": 1, "username": "ok"}\n{oops\n')
+        cases = (
+            {'users': broken},
+            {'users': self.write_jsonl('users.jsonl', [{'id': 1}])},
+        )
+        for paths in cases:
+            with self.subTest(paths=paths):
+                with self.assertRaises(CommandError):
+                    self.import_data(**paths)
+        self.assertFalse(Post.objects.exists())
@@ -0,0 +1,113 @@
+import re
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+import posts.tests.constants as ct
+from posts.models import Comment, Follow, Group, Post
+from posts.paginators import encode_cursor
+
+User = get_user_model()
+FULL_SCAN = re.compile(r'^SCAN (TABLE )?\w+$')
+TEMP_SORT = 'USE TEMP B-TREE'
+
+
+class QueryPlanTests(TestCase):
+    """Запросы лент не должны сканировать таблицы и сортировать в памяти.
+
+    Для каждого запроса, выполненного страницей, проверяется вывод
+    EXPLAIN QUERY PLAN: полный проход по таблице без индекса или
+    временное B-дерево для ORDER BY означают, что запросу не хватает
+    составного индекса.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='reader')
+        cls.author = User.objects.create_user(username='author')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        Follow.objects.create(user=cls.user, author=cls.author)
+        for i in range(3):
+            post = Post.objects.create(
+                author=cls.author, text=f'Пост {i}', group=cls.group)
+            Comment.objects.create(
+                post=post, author=cls.user, text=f'Коммент {i}')
+        cls.post = post
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def explain(self, sql):
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+            return [row[-1] for row in cursor.fetchall()]
+
+    def assert_indexed(self, url, **params):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.authorized_client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        for query in queries:
+            sql = query['sql']
+            if not sql.startswith('SELECT'):
+                continue
+            for step in self.explain(sql):
+                with self.subTest(url=url, sql=sql, step=step):
+                    self.assertIsNone(FULL_SCAN.match(step))
+                    self.assertNotIn(TEMP_SORT, step)
+
+    def test_index_plan(self):
+        """Главная страница."""
+        self.assert_indexed(reverse(ct.INDEX_URL_NAME))
+
+    def test_group_list_plan(self):
+        """Лента группы: индекс (group, pub_date)."""
+        self.assert_indexed(
+            reverse(ct.GROUP_LIST_URL_NAME, kwargs={'slug': self.group.slug}))
+
+    def test_profile_plan(self):
+        """Профиль: индекс (author, pub_date)."""
+        self.assert_indexed(
+            reverse(ct.PROFILE_URL_NAME, args=(self.author.username,)))
+
+    def test_post_detail_plan(self):
+        """Страница поста: индекс комментариев (post, created)."""
+        self.assert_indexed(
+            reverse(ct.POST_DETAIL_URL_NAME, kwargs={'post_id': self.post.id}))
+
+    def test_post_comments_plan(self):
+        """Порция комментариев: индекс (post, created)."""
+        self.assert_indexed(
+            reverse(ct.POST_COMMENTS_URL_NAME,
+                    kwargs={'post_id': self.post.id}))
+
+    def test_follow_index_plan(self):
+        """Лента подписок: индекс (user, pub_date, post)."""
+        self.assert_indexed(reverse(ct.FOLLOW_INDEX_URL_NAME))
+
+    def test_popular_plan(self):
+        """Популярное: индекс (-trending_score, -id)."""
+        self.assert_indexed(reverse('posts:popular'))
+
+    def test_next_page_plans(self):
+        """Страницы по курсору тоже идут по индексу."""
+        for url_name, kwargs in (
+            (ct.INDEX_URL_NAME, {}),
+            (ct.GROUP_LIST_URL_NAME, {'slug': self.group.slug}),
+            (ct.PROFILE_URL_NAME, {'username': self.author.username}),
+            (ct.FOLLOW_INDEX_URL_NAME, {}),
+        ):
+            url = reverse(url_name, kwargs=kwargs)
+            first = self.authorized_client.get(url).context['page_obj']
+            key = first.paginator.get_key(first[0])
+            self.assert_indexed(url, cursor=encode_cursor(key))
@@ -0,0 +1,102 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+import posts.tests.constants as ct
+from posts import recommendations
+from posts.models import Follow, Group, Post, Recommendation
+
+User = get_user_model()
+
+
+class RecommendationTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.reader = User.objects.create_user(username='reader')
+        cls.friend = User.objects.create_user(username='friend')
+        cls.star = User.objects.create_user(username='star')
+        cls.neighbour = User.objects.create_user(username='neighbour')
+        cls.group = Group.objects.create(title='Группа', slug='group')
+        # reader -> friend -> star; friend и neighbour пишут в одну группу.
+        Follow.objects.create(user=cls.reader, author=cls.friend)
+        Follow.objects.create(user=cls.friend, author=cls.star)
+        Follow.objects.create(user=cls.friend, author=cls.reader)
+        for author in (cls.friend, cls.neighbour):
+            Post.objects.create(author=author, group=cls.group,
+                                text=f'Пост {author}')
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.reader)
+
+    def recommended(self, user):
+        return list(Recommendation.objects.filter(user=user).values_list(
+            'author__username', flat=True))
+
+    def test_rebuild_ranks_candidates(self):
+        """Друг друга выше соседа по группе, себя и подписки не советуем."""
+        output = StringIO()
+        call_command('compute_recommendations', chunk_size=1, stdout=output)
+        self.assertIn('Рекомендаций: ', output.getvalue())
+        self.assertEqual(self.recommended(self.reader),
+                         ['star', 'neighbour'])
+        # friend подписан на reader, поэтому reader ему не предлагается.
+        self.assertNotIn('reader', self.recommended(self.friend))
+        self.assertNotIn('friend', self.recommended(self.friend))
+
+    def test_follow_index_shows_recommendations(self):
+        """Рекомендации видны в ленте подписок и пропадают после подписки."""
+        recommendations.rebuild()
+        url = reverse(ct.FOLLOW_INDEX_URL_NAME)
+        shown = [recommendation.author for recommendation
+                 in self.client.get(url).context['recommendations']]
+        self.assertEqual(shown, [self.star, self.neighbour])
+        self.client.get(
+            reverse('posts:profile_follow', args=[self.star.username]))
+        shown = [recommendation.author for recommendation
+                 in self.client.get(url).context['recommendations']]
+        self.assertEqual(shown, [self.neighbour])
+
+    def test_rebuild_replaces_stale(self):
+        """Без подписок старые рекомендации заменяются читаемыми авторами."""
+        recommendations.rebuild()
+        Follow.objects.filter(user=self.reader).delete()
+        recommendations.rebuild()
+        self.assertEqual(self.recommended(self.reader), ['star'])
+        self.assertLess(
+            Recommendation.objects.get(user=self.reader).score, 0)
+
+    def test_limit_filled_after_follow(self):
+        """Уже подписанные отсекаются до LIMIT, выдача не пустеет."""
+        recommendations.rebuild()
+        Follow.objects.create(user=self.reader, author=self.star)
+        shown = recommendations.for_user(self.reader, 1)
+        self.assertEqual([item.author for item in shown], [self.neighbour])
+
+    def test_cold_start(self):
+        """Без подписок советуются соседи по группам и читаемые авторы."""
+        writer = User.objects.create_user(username='writer')
+        Post.objects.create(author=writer, group=self.group, text='Пост')
+        newcomer = User.objects.create_user(username='newcomer')
+        recommendations.rebuild()
+        self.assertEqual(self.recommended(writer),
+                         ['friend', 'neighbour', 'star', 'reader'])
+        shown = recommendations.for_user(newcomer, 2)
+        # Подписчиков у всех поровну: выше более новые авторы.
+        self.assertEqual([item.author for item in shown],
+                         [self.star, self.friend])
+
+    def test_new_user_in_one_query(self):
+        """Пользователь после пересчёта сразу получает читаемых авторов."""
+        recommendations.rebuild()
+        newcomer = User.objects.create_user(username='newcomer')
+        with self.assertNumQueries(1):
+            shown = recommendations.for_user(newcomer, 2)
+        self.assertEqual([item.author for item in shown],
+                         [self.star, self.friend])
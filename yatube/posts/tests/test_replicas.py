@@ -0,0 +1,126 @@
+import json
+import os
+import shutil
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connections
+from django.test import TransactionTestCase, override_settings
+from django.urls import reverse
+
+import posts.tests.constants as ct
+from core import replicas
+from core.querystats import QueryStats
+from posts.models import Follow, Post
+
+User = get_user_model()
+
+
+class ReplicaTests(TransactionTestCase):
+    """Снимок снимается онлайн-бэкапом, поэтому данные тестов коммитятся."""
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username='author')
+        Post.objects.create(author=self.author, text='Старый пост')
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        replica = connections['replica']
+        name = replica.settings_dict['NAME']
+        replica.close()
+        replica.settings_dict['NAME'] = os.path.join(directory, 'replica.db')
+        self.addCleanup(replica.settings_dict.__setitem__, 'NAME', name)
+        self.addCleanup(replica.close)
+
+    def snapshot(self):
+        call_command('snapshot_replicas', stdout=StringIO())
+
+    def index_texts(self, client):
+        response = client.get(reverse(ct.INDEX_URL_NAME))
+        return [post.text for post in response.context['page_obj']]
+
+    def test_no_snapshot_reads_default(self):
+        """Пока снимка нет, всё читается из default."""
+        self.assertEqual(replicas.available(), [])
+        self.assertEqual(self.index_texts(self.client), ['Старый пост'])
+
+    def test_feed_reads_snapshot(self):
+        """Ленты читаются со снимка, запись уходит в default."""
+        self.snapshot()
+        Post.objects.create(author=self.author, text='Новый пост')
+        self.assertEqual(self.index_texts(self.client), ['Старый пост'])
+        self.assertEqual(Post.objects.count(), 2)
+        self.snapshot()
+        cache.clear()
+        self.assertEqual(self.index_texts(self.client),
+                         ['Новый пост', 'Старый пост'])
+
+    def test_author_pinned_after_write(self):
+        """После своего поста автор читает default и видит его сразу."""
+        self.snapshot()
+        self.client.force_login(self.author)
+        self.client.post(reverse(ct.POST_CREATE_URL_NAME),
+                         {'text': 'Только что'})
+        self.assertIn(replicas.PIN_COOKIE, self.client.cookies)
+        # Другой читатель видит снимок до следующего обновления, и его
+        # страница из кеша не достаётся автору.
+        self.assertEqual(self.index_texts(self.client_class()),
+                         ['Старый пост'])
+        self.assertEqual(self.index_texts(self.client),
+                         ['Только что', 'Старый пост'])
+
+    def test_router(self):
+        """Реплика выбирается только для моделей постов внутри запроса."""
+        router = replicas.ReplicaRouter()
+        self.assertIsNone(router.db_for_read(Post))
+        replicas._local.alias = 'replica'
+        self.addCleanup(setattr, replicas._local, 'alias', None)
+        self.assertEqual(router.db_for_read(Post), 'replica')
+        self.assertIsNone(router.db_for_read(User))
+        self.assertEqual(router.db_for_write(Post), 'default')
+        self.assertFalse(router.allow_migrate('replica', 'posts'))
+
+    def test_follow_link_pins(self):
+        """Подписка по GET-ссылке закрепляет читателя за default."""
+        reader = User.objects.create_user(username='reader')
+        self.snapshot()
+        self.client.force_login(reader)
+        self.client.get(
+            reverse('posts:profile_follow', args=[self.author.username]))
+        self.assertIn(replicas.PIN_COOKIE, self.client.cookies)
+        response = self.client.get(reverse(ct.FOLLOW_INDEX_URL_NAME))
+        self.assertEqual([post.text for post in response.context['page_obj']],
+                         ['Старый пост'])
+
+    def test_following_read_from_default(self):
+        """Множество подписок не берётся из отстающего снимка."""
+        reader = User.objects.create_user(username='reader')
+        self.snapshot()
+        Follow.objects.create(user=reader, author=self.author)
+        client = self.client_class()
+        client.force_login(reader)
+        response = client.get(
+            reverse(ct.PROFILE_URL_NAME, args=[self.author.username]))
+        self.assertTrue(response.context['following'])
+
+    def test_view_does_not_pin(self):
+        """Засчитанный просмотр поста не закрепляет читателя."""
+        self.snapshot()
+        post = Post.objects.get()
+        self.client.get(reverse(ct.POST_DETAIL_URL_NAME, args=[post.pk]))
+        self.assertNotIn(replicas.PIN_COOKIE, self.client.cookies)
+
+    @override_settings(SERVER_TIMING=True)
+    def test_server_timing_counts_replica(self):
+        """Server-Timing учитывает запросы, ушедшие на реплику."""
+        self.snapshot()
+        with self.assertLogs('core.timing', 'INFO') as logs:
+            with QueryStats('replica') as stats:
+                self.client.get(reverse(ct.INDEX_URL_NAME))
+        record = json.loads(logs.records[0].getMessage())
+        self.assertGreater(stats.queries, 0)
+        self.assertGreaterEqual(record['db_queries'], stats.queries)
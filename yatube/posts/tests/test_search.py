@@ -0,0 +1,80 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+
+from posts.models import Post
+from posts.search import FTS_TABLE
+
+User = get_user_model()
+SEARCH_URL_NAME = 'posts:search'
+
+
+class SearchViewTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='NAY')
+        cls.post = Post.objects.create(
+            author=cls.user, text='Комитет провёл заседание')
+        cls.other = Post.objects.create(
+            author=cls.user, text='Отчёт о <b>работе</b> комитета')
+
+    def search(self, query, **params):
+        return self.client.get(
+            reverse(SEARCH_URL_NAME), {'q': query, **params})
+
+    def test_search_finds_by_word_prefix(self):
+        """Поиск находит посты по началу слова без учёта регистра."""
+        response = self.search('комитет')
+        self.assertCountEqual(
+            response.context['page_obj'], [self.post, self.other])
+
+    def test_search_highlights_and_escapes(self):
+        """Совпадения подсвечиваются, а HTML из текста экранируется."""
+        response = self.search('работе')
+        self.assertContains(response, '&lt;b&gt;<mark>работе</mark>')
+
+    def test_page_param_keeps_snippets(self):
+        """Старый параметр ?page не теряет сниппеты результатов."""
+        response = self.search('работе', page=1)
+        self.assertContains(response, '&lt;b&gt;<mark>работе</mark>')
+
+    def test_index_follows_edit_and_delete(self):
+        """Индекс обновляется при изменении и удалении поста."""
+        post = Post.objects.get(pk=self.post.pk)
+        post.text = 'Новая повестка'
+        post.save()
+        self.assertEqual(list(self.search('повестка').context['page_obj']),
+                         [post])
+        self.assertNotIn(post, self.search('заседание').context['page_obj'])
+        post.delete()
+        self.assertEqual(list(self.search('повестка').context['page_obj']),
+                         [])
+
+    def test_search_cursor_pagination(self):
+        """Результаты поиска листаются курсором без повторов."""
+        Post.objects.bulk_create(
+            Post(author=self.user, text=f'Сводка номер {i}')
+            for i in range(15)
+        )
+        call_command('rebuild_search_index', stdout=StringIO())
+        first = self.search('сводка').context['page_obj']
+        second = self.search(
+            'сводка', cursor=first.paginator.next_cursor
+        ).context['page_obj']
+        self.assertEqual(len(first) + len(second), 15)
+        self.assertFalse(set(first) & set(second))
+
+    def test_rebuild_command(self):
+        """Команда rebuild_search_index заново наполняет индекс."""
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE}')
+        self.assertEqual(list(self.search('комитет').context['page_obj']),
+                         [])
+        call_command('rebuild_search_index', stdout=StringIO())
+        self.assertEqual(len(self.search('комитет').context['page_obj']), 2)
@@ -0,0 +1,64 @@
+import json
+import time
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+import posts.tests.constants as ct
+from core import timing
+from core.querystats import QueryStats
+from posts.models import Post
+
+User = get_user_model()
+
+
+class ServerTimingTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='NAY')
+        cls.post = Post.objects.create(author=cls.user, text='Тестовый пост')
+
+    def test_disabled_by_default(self):
+        """Без настройки заголовок не добавляется."""
+        response = Client().get(reverse(ct.INDEX_URL_NAME))
+        self.assertNotIn('Server-Timing', response)
+
+    @override_settings(SERVER_TIMING=True)
+    def test_header_and_log_line(self):
+        """Заголовок и лог содержат время SQL, шаблонов и представления."""
+        with self.assertLogs('core.timing', 'INFO') as logs:
+            response = Client().get(
+                reverse(ct.POST_DETAIL_URL_NAME, args=[self.post.pk]))
+        header = response['Server-Timing']
+        for metric in ('total;dur=', 'view;dur=', 'db;dur=', 'tpl;dur='):
+            with self.subTest(metric=metric):
+                self.assertIn(metric, header)
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(record['status'], 200)
+        self.assertGreater(record['db_queries'], 0)
+        self.assertIn('tpl_ms', record)
+        self.assertIn(f'"{record["db_queries"]} queries', header)
+
+    def test_debug_cursor_still_logs(self):
+        """Подсчёт не прячет запросы от connection.queries."""
+        with CaptureQueriesContext(connection) as queries:
+            with QueryStats() as stats:
+                list(Post.objects.all())
+        self.assertEqual(len(queries), 1)
+        self.assertEqual((stats.queries, stats.rows), (1, 1))
+
+    def test_nested_blocks_counted_once(self):
+        """Вложенный рендер не удваивает время внешнего."""
+        timer = timing.start()
+        self.addCleanup(timing.stop)
+        with timing.timed('tpl'):
+            with timing.timed('tpl'):
+                time.sleep(0.01)
+        duration, count = timer.metrics['tpl']
+        self.assertEqual(count, 1)
+        self.assertLess(duration, 0.02)
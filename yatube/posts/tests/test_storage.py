@@ -0,0 +1,103 @@
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+
+from core.models import Blob
+from core.thumbnails import THUMBNAIL_SIZES, find_thumbnail
+from posts.models import Comment, Post
+
+User = get_user_model()
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+SMALL_GIF = (
+    b"\x47\x49\x46\x38\x39\x61\x02\x00"
+    b"\x01\x00\x80\x00\x00\x00\x00\x00"
+    b"\xFF\xFF\xFF\x21\xF9\x04\x00\x00"
+    b"\x00\x00\x00\x2C\x00\x00\x00\x00"
+    b"\x02\x00\x01\x00\x00\x02\x02\x0C"
+    b"\x0A\x00\x3B"
+)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT, THUMBNAIL_WORKERS=0)
+class ContentAddressedStorageTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='NAY')
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        # В TestCase транзакция не коммитится: ссылки снимаются сразу.
+        patcher = mock.patch('core.storage.transaction.on_commit',
+                             lambda func: func())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def upload(self, name='meme.gif', content=SMALL_GIF):
+        return SimpleUploadedFile(name, content, content_type='image/gif')
+
+    def create_post(self, name='meme.gif'):
+        return Post.objects.create(author=self.user, text='Мем',
+                                   image=self.upload(name))
+
+    def exists(self, name):
+        return os.path.exists(os.path.join(TEMP_MEDIA_ROOT, name))
+
+    def test_same_bytes_stored_once(self):
+        """Одинаковые картинки постов и комментариев — один файл."""
+        first = self.create_post('meme.gif')
+        second = self.create_post('repost.gif')
+        comment = Comment.objects.create(post=first, author=self.user,
+                                         text='Тот же мем',
+                                         image=self.upload())
+        self.assertEqual(first.image.name, second.image.name)
+        self.assertEqual(comment.image.name, first.image.name)
+        self.assertEqual(Blob.objects.get(name=first.image.name).refs, 3)
+        for geometry in THUMBNAIL_SIZES:
+            with self.subTest(geometry=geometry):
+                self.assertEqual(
+                    find_thumbnail(second.image, geometry).name,
+                    find_thumbnail(first.image, geometry).name)
+
+    def test_file_removed_with_last_reference(self):
+        """Файл и миниатюры удаляются вместе с последней ссылкой."""
+        first = self.create_post()
+        second = self.create_post()
+        name = first.image.name
+        thumbnail = find_thumbnail(first.image, THUMBNAIL_SIZES[0])
+        first.delete()
+        self.assertTrue(self.exists(name))
+        second.delete()
+        self.assertFalse(self.exists(name))
+        self.assertFalse(self.exists(thumbnail.name))
+        self.assertFalse(Blob.objects.filter(name=name).exists())
+
+    def test_failed_save_keeps_no_reference(self):
+        """Если строка поста не записалась, ссылка на файл не остаётся."""
+        with mock.patch('posts.timeline.fan_out',
+                        side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                self.create_post()
+        self.assertFalse(Post.objects.exists())
+        self.assertFalse(Blob.objects.filter(refs__gt=0).exists())
+
+    def test_replaced_image_released(self):
+        """Замена картинки поста снимает ссылку со старой."""
+        post = self.create_post()
+        name = post.image.name
+        post.image = self.upload(
+            'other.gif', SMALL_GIF.replace(b'\xFF\xFF\xFF', b'\x00\xFF\x00'))
+        post.save()
+        self.assertFalse(self.exists(name))
+        self.assertEqual(Blob.objects.get(name=post.image.name).refs, 1)
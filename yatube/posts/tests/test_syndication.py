@@ -0,0 +1,138 @@
+from contextlib import contextmanager
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from posts.models import Group, Post
+
+User = get_user_model()
+
+
+@contextmanager
+def later(minutes):
+    """Изменение через minutes минут: у HTTP-даты точность в секунду."""
+    moment = timezone.now() + timedelta(minutes=minutes)
+    with mock.patch('django.utils.timezone.now', return_value=moment), \
+            mock.patch('time.time', return_value=moment.timestamp()):
+        yield
+
+
+class SyndicationTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(
+            username='author', first_name='Лев', last_name='Толстой')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        cls.post = Post.objects.create(
+            author=cls.user, group=cls.group, text='Тестовый пост')
+
+    def setUp(self):
+        cache.clear()
+        self.feeds = {
+            'rss': (
+                reverse('posts:index_rss'),
+                reverse('posts:group_rss', args=[self.group.slug]),
+                reverse('posts:profile_rss', args=[self.user.username]),
+            ),
+            'atom': (
+                reverse('posts:index_atom'),
+                reverse('posts:group_atom', args=[self.group.slug]),
+                reverse('posts:profile_atom', args=[self.user.username]),
+            ),
+        }
+
+    def test_feed_content(self):
+        """Ленты отдают последние посты в RSS и Atom."""
+        markers = {'rss': '<rss', 'atom': '<feed'}
+        for kind, urls in self.feeds.items():
+            for url in urls:
+                with self.subTest(url=url):
+                    response = self.client.get(url)
+                    content = response.content.decode()
+                    self.assertEqual(response.status_code, 200)
+                    self.assertIn(kind, response['Content-Type'])
+                    self.assertIn(markers[kind], content)
+                    self.assertIn('Тестовый пост', content)
+                    self.assertIn('Лев Толстой', content)
+                    self.assertIn(reverse('posts:post_detail',
+                                          args=[self.post.pk]), content)
+
+    def test_not_modified(self):
+        """Клиент с актуальными валидаторами получает 304."""
+        for urls in self.feeds.values():
+            for url in urls:
+                with self.subTest(url=url):
+                    response = self.client.get(url)
+                    response = self.client.get(
+                        url, HTTP_IF_NONE_MATCH=response['ETag'])
+                    self.assertEqual(response.status_code, 304)
+
+    def test_if_modified_since(self):
+        """Опрос по If-Modified-Since получает 304, пока лента не менялась."""
+        for urls in self.feeds.values():
+            for url in urls:
+                with self.subTest(url=url):
+                    response = self.client.get(url)
+                    response = self.client.get(
+                        url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+                    self.assertEqual(response.status_code, 304)
+
+    def revalidate_after(self, change):
+        """Ответы на If-Modified-Since, снятый до change()."""
+        urls = [url for urls in self.feeds.values() for url in urls]
+        since = [self.client.get(url)['Last-Modified'] for url in urls]
+        with later(minutes=1):
+            change()
+        return {url: self.client.get(url, HTTP_IF_MODIFIED_SINCE=value)
+                for url, value in zip(urls, since)}
+
+    def test_edit_moves_last_modified(self):
+        """Правка поста не прячется за 304 по дате."""
+        post = Post.objects.get(pk=self.post.pk)
+        post.text = 'Исправленный пост'
+        for url, response in self.revalidate_after(post.save).items():
+            with self.subTest(url=url):
+                self.assertEqual(response.status_code, 200)
+                self.assertIn('Исправленный пост', response.content.decode())
+
+    def test_delete_moves_last_modified(self):
+        """Удалённый пост пропадает и у клиентов с If-Modified-Since."""
+        extra = Post.objects.create(
+            author=self.user, group=self.group, text='Лишний пост')
+        for url, response in self.revalidate_after(extra.delete).items():
+            with self.subTest(url=url):
+                self.assertEqual(response.status_code, 200)
+                self.assertNotIn('Лишний пост', response.content.decode())
+
+    def test_cached_until_new_post(self):
+        """XML берётся из кеша, пока не появится новый пост."""
+        url = self.feeds['rss'][1]
+        self.client.get(url)
+        with self.assertNumQueries(1):
+            response = self.client.get(url)
+        self.assertNotIn('Новый пост', response.content.decode())
+        Post.objects.create(
+            author=self.user, group=self.group, text='Новый пост')
+        response = self.client.get(url)
+        self.assertIn('Новый пост', response.content.decode())
+
+    def test_unknown_object(self):
+        """Лента несуществующей группы или автора — 404."""
+        urls = (
+            reverse('posts:group_rss', args=['missing']),
+            reverse('posts:profile_atom', args=['missing']),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                self.assertEqual(self.client.get(url).status_code, 404)
@@ -0,0 +1,101 @@
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings, TestCase
+from django.urls import reverse
+from sorl.thumbnail import default
+from sorl.thumbnail.images import ImageFile
+
+import posts.tests.constants as ct
+from core.thumbnails import (THUMBNAIL_SIZES, VARIANT_FORMATS, find_thumbnail,
+                             generate, variants)
+from posts.models import Post
+
+User = get_user_model()
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+SMALL_GIF = (
+    b"\x47\x49\x46\x38\x39\x61\x02\x00"
+    b"\x01\x00\x80\x00\x00\x00\x00\x00"
+    b"\xFF\xFF\xFF\x21\xF9\x04\x00\x00"
+    b"\x00\x00\x00\x2C\x00\x00\x00\x00"
+    b"\x02\x00\x01\x00\x00\x02\x02\x0C"
+    b"\x0A\x00\x3B"
+)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class ThumbnailTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='NAY')
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+
+    def create_post(self):
+        return Post.objects.create(
+            author=self.user,
+            text='Пост с картинкой',
+            image=SimpleUploadedFile(
+                'small.gif', SMALL_GIF, content_type='image/gif'),
+        )
+
+    @override_settings(THUMBNAIL_WORKERS=0)
+    def test_upload_pregenerates_all_sizes(self):
+        """При загрузке картинки нарезаются все размеры из шаблонов."""
+        post = self.create_post()
+        for geometry in THUMBNAIL_SIZES:
+            with self.subTest(geometry=geometry):
+                self.assertIsNotNone(find_thumbnail(post.image, geometry))
+
+    @mock.patch('core.thumbnails.use_workers', return_value=True)
+    def test_missing_thumbnail_renders_placeholder(self, use_workers):
+        """Пока воркер не нарезал миниатюру, шаблон показывает заглушку."""
+        post = self.create_post()
+        response = self.client.get(
+            reverse(ct.POST_DETAIL_URL_NAME, kwargs={'post_id': post.id}))
+        self.assertContains(response, 'aspect-ratio: 960 / 339')
+        self.assertNotContains(response, 'cache/')
+
+    @override_settings(THUMBNAIL_WORKERS=0)
+    def test_variants_decoded_once(self):
+        """Все варианты всех размеров режутся из одного декодирования."""
+        post = self.create_post()
+        default.kvstore.clear()
+        shutil.rmtree(os.path.join(TEMP_MEDIA_ROOT, 'cache'))
+        with mock.patch.object(default.engine, 'get_image',
+                               wraps=default.engine.get_image) as get_image:
+            generate(ImageFile(post.image))
+        self.assertEqual(get_image.call_count, 1)
+        for size in THUMBNAIL_SIZES:
+            for geometry in variants(size):
+                for image_format in VARIANT_FORMATS:
+                    with self.subTest(geometry=geometry, format=image_format):
+                        self.assertIsNotNone(find_thumbnail(
+                            post.image, geometry, image_format))
+
+    @override_settings(THUMBNAIL_WORKERS=0)
+    def test_srcset_and_lazy_loading(self):
+        """Карточки отдают srcset, картинки ниже первых — с loading=lazy."""
+        for _ in range(3):
+            self.create_post()
+        response = self.client.get(reverse(ct.INDEX_URL_NAME))
+        content = response.content.decode()
+        self.assertEqual(content.count('srcset='), 3 * len(VARIANT_FORMATS))
+        for width in (480, 960, 1440):
+            with self.subTest(width=width):
+                self.assertIn(f' {width}w', content)
+        self.assertEqual(content.count('loading="lazy"'), 1)
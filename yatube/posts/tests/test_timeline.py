@@ -0,0 +1,76 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, override_settings, TestCase
+from django.urls import reverse
+
+import posts.tests.constants as ct
+from posts.models import Follow, Post, TimelineEntry
+
+User = get_user_model()
+
+
+class TimelineTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.reader = User.objects.create_user(username='reader')
+        cls.author = User.objects.create_user(username='author')
+        cls.star = User.objects.create_user(username='star')
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.reader)
+
+    def get_feed(self):
+        response = self.authorized_client.get(
+            reverse(ct.FOLLOW_INDEX_URL_NAME))
+        return list(response.context['page_obj'])
+
+    def test_new_post_fanned_out_to_followers(self):
+        """Новый пост попадает во входящую ленту подписчика."""
+        Follow.objects.create(user=self.reader, author=self.author)
+        post = Post.objects.create(author=self.author, text='Новый пост')
+        self.assertTrue(
+            TimelineEntry.objects.filter(user=self.reader, post=post).exists())
+        self.assertEqual(self.get_feed(), [post])
+
+    def test_follow_backfills_and_unfollow_prunes(self):
+        """Подписка дозаполняет ленту, отписка очищает её."""
+        post = Post.objects.create(author=self.author, text='Старый пост')
+        self.authorized_client.get(
+            reverse('posts:profile_follow', args=(self.author.username,)))
+        self.assertEqual(self.get_feed(), [post])
+        self.authorized_client.get(
+            reverse('posts:profile_unfollow', args=(self.author.username,)))
+        self.assertFalse(TimelineEntry.objects.filter(user=self.reader))
+        self.assertEqual(self.get_feed(), [])
+
+    @override_settings(TIMELINE_FANOUT_LIMIT=0)
+    def test_celebrity_posts_pulled_on_read(self):
+        """Посты знаменитостей не рассылаются, а подмешиваются при чтении."""
+        Follow.objects.create(user=self.reader, author=self.author)
+        regular = Post.objects.create(author=self.author, text='Обычный')
+        cache.clear()
+        Follow.objects.create(user=self.reader, author=self.star)
+        celebrity = Post.objects.create(author=self.star, text='Звёздный')
+        self.assertFalse(
+            TimelineEntry.objects.filter(post=celebrity).exists())
+        self.assertEqual(self.get_feed(), [celebrity, regular])
+
+    @override_settings(TIMELINE_FANOUT_LIMIT=1)
+    def test_demoted_celebrity_posts_backfilled(self):
+        """Посты бывшей знаменитости остаются в лентах подписчиков."""
+        fan = User.objects.create_user(username='fan')
+        Follow.objects.create(user=self.reader, author=self.star)
+        follow = Follow.objects.create(user=fan, author=self.star)
+        cache.clear()
+        post = Post.objects.create(author=self.star, text='Звёздный')
+        self.assertFalse(TimelineEntry.objects.filter(post=post).exists())
+        follow.delete()
+        self.assertTrue(
+            TimelineEntry.objects.filter(user=self.reader, post=post).exists())
+        self.assertEqual(self.get_feed(), [post])
+        later = Post.objects.create(author=self.star, text='Позже')
+        self.assertEqual(self.get_feed(), [later, post])
@@ -0,0 +1,100 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+import posts.tests.constants as ct
+from posts import trending
+from posts.models import Comment, Post
+
+User = get_user_model()
+
+
+@override_settings(TRENDING_HALF_LIFE=60 * 60)
+class TrendingTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.posts = [Post.objects.create(author=cls.author, text=f'Пост {i}')
+                     for i in range(3)]
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.author)
+
+    def score(self, post):
+        return Post.objects.values_list(
+            'trending_score', flat=True).get(pk=post.pk)
+
+    def test_scores_updated_incrementally(self):
+        """Новый пост, комментарий и просмотр добавляют свои веса."""
+        post = self.posts[0]
+        self.assertEqual(self.score(post), trending.NEW_POST_WEIGHT)
+        self.client.post(reverse(ct.POST_ADD_COMMENT, args=[post.id]),
+                         {'text': 'Комментарий'})
+        self.client.get(reverse(ct.POST_DETAIL_URL_NAME, args=[post.id]))
+        self.assertAlmostEqual(
+            self.score(post),
+            trending.NEW_POST_WEIGHT + trending.COMMENT_WEIGHT
+            + trending.VIEW_WEIGHT)
+
+    def test_comment_signals(self):
+        """Комментарии в обход представления тоже меняют оценку."""
+        post = self.posts[1]
+        comment = Comment.objects.create(post=post, author=self.author,
+                                         text='Из админки')
+        self.assertAlmostEqual(
+            self.score(post),
+            trending.NEW_POST_WEIGHT + trending.COMMENT_WEIGHT)
+        comment.delete()
+        self.assertAlmostEqual(self.score(post), trending.NEW_POST_WEIGHT,
+                               places=3)
+
+    def test_bulk_loaded_posts_scored(self):
+        """Посты из bulk_create получают оценку при пересчёте."""
+        Post.objects.bulk_create(
+            [Post(author=self.author, text='Загруженный')])
+        post = Post.objects.get(text='Загруженный')
+        Post.objects.filter(pk=post.pk).update(comments_count=2)
+        self.assertEqual(self.score(post), 0)
+        self.assertEqual(trending.rebuild(), 1)
+        self.assertAlmostEqual(
+            self.score(post),
+            trending.NEW_POST_WEIGHT + 2 * trending.COMMENT_WEIGHT, places=3)
+
+    def test_view_counted_once_per_client(self):
+        """Обновление страницы и ответ 304 не засчитываются повторно."""
+        post = self.posts[0]
+        url = reverse(ct.POST_DETAIL_URL_NAME, args=[post.id])
+        etag = self.client.get(url)['ETag']
+        self.client.get(url)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertAlmostEqual(
+            self.score(post), trending.NEW_POST_WEIGHT + trending.VIEW_WEIGHT)
+        self.client_class().get(url)
+        self.assertAlmostEqual(
+            self.score(post),
+            trending.NEW_POST_WEIGHT + 2 * trending.VIEW_WEIGHT)
+
+    def test_popular_page_ranks_by_score(self):
+        """Страница популярного упорядочена по оценке."""
+        trending.bump(self.posts[0].id, 5)
+        Post.objects.filter(pk=self.posts[1].pk).update(trending_score=0)
+        response = self.client.get(reverse('posts:popular'))
+        self.assertEqual(list(response.context['posts']),
+                         [self.posts[0], self.posts[2]])
+
+    def test_decay_command(self):
+        """Команда вдвое уменьшает оценки за период полураспада."""
+        Post.objects.filter(pk=self.posts[1].pk).update(
+            trending_score=trending.MIN_SCORE)
+        call_command('decay_trending', hours=1, stdout=StringIO())
+        self.assertAlmostEqual(self.score(self.posts[0]),
+                               trending.NEW_POST_WEIGHT / 2)
+        self.assertEqual(self.score(self.posts[1]), 0)
@@ -6,13 +6,18 @@ from http import HTTPStatus
 from django import forms
 from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
 from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.cache import cache
 from django.core.paginator import Page
+from django.db import connection
 from django.test import Client, override_settings, TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
+from core.storage import content_name
 from posts.models import Comment, Follow, Group, Post
-from posts.views import NUMBER_OF_POSTS
+from posts.views import COMMENTS_PER_PAGE, NUMBER_OF_POSTS
 
 User = get_user_model()
 
@@ -69,6 +74,109 @@ class PaginatorViewsTest(TestCase):
             page_obj, self.user.posts.all()[:NUMBER_OF_POSTS], lambda x: x)
 
 
+class CursorPaginatorViewsTest(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='cursor')
+        Post.objects.bulk_create(
+            Post(author=cls.user, text=f'Пост {i}')
+            for i in range(NUMBER_OF_POSTS * 2 + 3)
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def get_page(self, **params):
+        response = self.client.get(reverse(ct.INDEX_URL_NAME), params)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        return response.context['page_obj']
+
+    def test_cursor_walks_whole_feed(self):
+        """Курсоры next обходят ленту без пропусков и повторов."""
+        seen = []
+        page_obj = self.get_page()
+        seen.extend(page_obj)
+        while page_obj.paginator.next_cursor:
+            page_obj = self.get_page(cursor=page_obj.paginator.next_cursor)
+            seen.extend(page_obj)
+        self.assertEqual(seen, list(Post.objects.all()))
+
+    def test_previous_cursor_returns_previous_page(self):
+        """Курсор previous возвращает на предыдущую страницу."""
+        first = self.get_page()
+        second = self.get_page(cursor=first.paginator.next_cursor)
+        self.assertIsNotNone(second.paginator.previous_cursor)
+        back = self.get_page(cursor=second.paginator.previous_cursor)
+        self.assertEqual(list(back), list(first))
+        self.assertIsNone(back.paginator.previous_cursor)
+
+    def test_first_page_skips_count(self):
+        """Первая страница по курсору не делает COUNT(*)."""
+        with CaptureQueriesContext(connection) as queries:
+            self.get_page()
+        self.assertFalse(
+            any('COUNT(' in query['sql'] for query in queries))
+
+    def test_page_number_links_still_work(self):
+        """Старые ссылки ?page=N отдают нужную страницу."""
+        page_obj = self.get_page(page=2)
+        self.assertEqual(page_obj.number, 2)
+        self.assertEqual(
+            list(page_obj),
+            list(Post.objects.all()[NUMBER_OF_POSTS:NUMBER_OF_POSTS * 2]))
+
+    def test_broken_cursor_falls_back_to_first_page(self):
+        """Битый курсор отдаёт первую страницу."""
+        page_obj = self.get_page(cursor='not-a-cursor')
+        self.assertEqual(
+            list(page_obj), list(Post.objects.all()[:NUMBER_OF_POSTS]))
+
+
+class CommentsPaginationTest(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='NAY')
+        cls.post = Post.objects.create(author=cls.user, text='Пост')
+        Comment.objects.bulk_create(
+            Comment(post=cls.post, author=cls.user, text=f'Коммент {i}')
+            for i in range(COMMENTS_PER_PAGE + 5)
+        )
+
+    def test_post_detail_shows_first_chunk(self):
+        """На странице поста только первая порция комментариев."""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse(
+                ct.POST_DETAIL_URL_NAME, kwargs={'post_id': self.post.id}))
+        comments = response.context['comments']
+        self.assertEqual(
+            list(comments),
+            list(self.post.comments.all()[:COMMENTS_PER_PAGE]))
+        self.assertIsNotNone(comments.paginator.next_cursor)
+        self.assertFalse(
+            any('FROM "auth_user" WHERE' in query['sql']
+                for query in queries))
+
+    def test_next_chunk_fragment(self):
+        """Фрагмент со следующей порцией продолжает список."""
+        response = self.client.get(reverse(
+            ct.POST_DETAIL_URL_NAME, kwargs={'post_id': self.post.id}))
+        cursor = response.context['comments'].paginator.next_cursor
+        response = self.client.get(
+            reverse(ct.POST_COMMENTS_URL_NAME,
+                    kwargs={'post_id': self.post.id}),
+            {'cursor': cursor})
+        self.assertTemplateUsed(response, 'includes/comment_list.html')
+        self.assertTemplateNotUsed(response, 'base.html')
+        self.assertEqual(
+            list(response.context['comments']),
+            list(self.post.comments.all()[COMMENTS_PER_PAGE:]))
+        self.assertIsNone(response.context['comments'].paginator.next_cursor)
+
+
 TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
 
 
@@ -239,13 +347,83 @@ class PagesTests(TestCase):
                         (text="Тестовый коммент").exists())
 
     def test_check_cache(self):
-        """Проверка кеша."""
+        """Проверка кеша: повторный запрос не ходит в базу за лентой."""
+        cache.clear()
         response_to_page = self.client.get(reverse(ct.INDEX_URL_NAME))
-        content_of_responsed_page = response_to_page.content
-        Post.objects.get(id=1).delete()
-        response_to_cache_page = self.client.get(reverse(ct.INDEX_URL_NAME))
-        content_of_cached_page = response_to_cache_page.content
-        self.assertEqual(content_of_responsed_page, content_of_cached_page)
+        with CaptureQueriesContext(connection) as queries:
+            response_to_cache_page = self.client.get(
+                reverse(ct.INDEX_URL_NAME))
+        self.assertEqual(
+            response_to_page.content, response_to_cache_page.content)
+        post_queries = [query['sql'] for query in queries
+                        if 'posts_post' in query['sql']]
+        # Остаётся только запрос валидаторов для условного GET.
+        self.assertEqual(len(post_queries), 1)
+        self.assertIn('LIMIT 1', post_queries[0])
+
+    def test_cache_invalidated_on_new_post(self):
+        """Новый пост сразу виден в закешированных лентах."""
+        cache.clear()
+        urls = (
+            reverse(ct.INDEX_URL_NAME),
+            reverse(ct.GROUP_LIST_URL_NAME, kwargs={'slug': self.group.slug}),
+            reverse(ct.PROFILE_URL_NAME, args=(self.user.username,)),
+        )
+        for url in urls:
+            self.client.get(url)
+        post = Post.objects.create(
+            author=self.user, text='Свежий пост', group=self.group)
+        for url in urls:
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertIn(post, response.context['page_obj'])
+                self.assertContains(response, 'Свежий пост')
+
+    def test_cache_invalidated_on_delete(self):
+        """Удалённый пост пропадает из закешированной ленты."""
+        cache.clear()
+        self.client.get(reverse(ct.INDEX_URL_NAME))
+        post = Post.objects.create(author=self.user, text='Удаляемый пост')
+        self.client.get(reverse(ct.INDEX_URL_NAME))
+        post.delete()
+        response = self.client.get(reverse(ct.INDEX_URL_NAME))
+        self.assertNotContains(response, 'Удаляемый пост')
+
+    def test_cache_invalidated_on_rename(self):
+        """Правка группы и имени автора видна в закешированных лентах."""
+        cache.clear()
+        urls = (
+            reverse(ct.INDEX_URL_NAME),
+            reverse(ct.GROUP_LIST_URL_NAME, kwargs={'slug': self.group.slug}),
+            reverse(ct.PROFILE_URL_NAME, args=(self.user.username,)),
+        )
+        for url in urls:
+            self.client.get(url)
+        group = Group.objects.get(pk=self.group.pk)
+        group.title = 'Новое название'
+        group.save()
+        author = User.objects.get(pk=self.user.pk)
+        author.first_name = 'Новое'
+        author.save()
+        for url in urls:
+            with self.subTest(url=url):
+                post = self.client.get(url).context['page_obj'][0]
+                self.assertEqual(post.group.title, 'Новое название')
+                self.assertEqual(post.author.first_name, 'Новое')
+
+    def test_cache_varies_on_page(self):
+        """Разные страницы ленты кешируются под разными ключами."""
+        cache.clear()
+        Post.objects.bulk_create(
+            Post(author=self.user, text=f'Пост {i}')
+            for i in range(NUMBER_OF_POSTS)
+        )
+        first = self.client.get(reverse(ct.INDEX_URL_NAME))
+        second = self.client.get(
+            reverse(ct.INDEX_URL_NAME), {'page': 2})
+        self.assertNotEqual(
+            list(first.context['page_obj']), list(second.context['page_obj']))
+        self.assertNotEqual(first.content, second.content)
 
     def test_count_profile_without_follows(self):
         response_to_folow_page = self.authorized_client.get(
@@ -303,6 +481,8 @@ class PagesTests(TestCase):
     def test_image_in_page(self):
         """Проверяем что пост с картинкой создается в БД"""
         self.assertTrue(
-            Post.objects.filter(text="Тестовая запись",
-                                image="posts/small.gif").exists()
+            Post.objects.filter(
+                text="Тестовая запись",
+                image=content_name("small.gif", ContentFile(self.small_gif)),
+            ).exists()
         )
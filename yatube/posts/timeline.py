@@ -0,0 +1,147 @@
+"""Материализованная лента подписок.
+
+Новый пост раскладывается по записям TimelineEntry всех подписчиков
+автора, поэтому лента подписок читается одним диапазоном по индексу
+(user, pub_date, post). Посты авторов, у которых подписчиков больше
+TIMELINE_FANOUT_LIMIT, не раскладываются, а подмешиваются при чтении.
+Когда такой автор теряет подписчиков и опускается до лимита, его посты
+раскладываются по лентам оставшихся подписчиков.
+"""
+from itertools import islice
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import AuthorStats, Follow, Post, TimelineEntry
+from .paginators import CursorPaginator, keyset
+
+CELEBRITIES_CACHE_KEY = 'timeline:celebrities'
+
+
+def get_celebrity_ids():
+    celebrity_ids = cache.get(CELEBRITIES_CACHE_KEY)
+    if celebrity_ids is None:
+        celebrity_ids = set(
+            AuthorStats.objects.filter(
+                followers_count__gt=settings.TIMELINE_FANOUT_LIMIT
+            ).values_list('user_id', flat=True)
+        )
+        cache.set(CELEBRITIES_CACHE_KEY, celebrity_ids,
+                  settings.TIMELINE_CELEBRITIES_TIMEOUT)
+    return celebrity_ids
+
+
+def bulk_insert(entries):
+    entries = iter(entries)
+    while True:
+        batch = list(islice(entries, settings.TIMELINE_BATCH_SIZE))
+        if not batch:
+            break
+        TimelineEntry.objects.bulk_create(batch, ignore_conflicts=True)
+
+
+def fan_out(post):
+    if post.author_id in get_celebrity_ids():
+        return
+    followers = Follow.objects.filter(author_id=post.author_id).values_list(
+        'user_id', flat=True
+    )
+    bulk_insert(
+        TimelineEntry(user_id=user_id, post_id=post.pk,
+                      author_id=post.author_id, pub_date=post.pub_date)
+        for user_id in followers.iterator()
+    )
+
+
+def backfill(user_id, author_id):
+    if author_id in get_celebrity_ids():
+        return
+    posts = Post.objects.filter(author_id=author_id).values_list(
+        'id', 'pub_date'
+    )
+    bulk_insert(
+        TimelineEntry(user_id=user_id, post_id=post_id,
+                      author_id=author_id, pub_date=pub_date)
+        for post_id, pub_date in posts.iterator()
+    )
+
+
+def follower_lost(author_id):
+    """Раскладывает посты автора, переставшего быть знаменитостью."""
+    demoted = AuthorStats.objects.filter(
+        user_id=author_id, followers_count=settings.TIMELINE_FANOUT_LIMIT
+    ).exists()
+    if not demoted:
+        return
+    # Иначе fan_out ещё до истечения кеша пропускал бы его новые посты.
+    cache.delete(CELEBRITIES_CACHE_KEY)
+    posts = list(Post.objects.filter(author_id=author_id).values_list(
+        'id', 'pub_date'
+    ))
+    followers = Follow.objects.filter(author_id=author_id).values_list(
+        'user_id', flat=True
+    )
+    bulk_insert(
+        TimelineEntry(user_id=user_id, post_id=post_id,
+                      author_id=author_id, pub_date=pub_date)
+        for user_id in followers.iterator()
+        for post_id, pub_date in posts
+    )
+
+
+def prune(user_id, author_id):
+    TimelineEntry.objects.filter(user_id=user_id, author_id=author_id).delete()
+
+
+def rebuild():
+    """Заново раскладывает все подписки по лентам; возвращает число записей."""
+    TimelineEntry.objects.all().delete()
+    follows = Follow.objects.values_list('user_id', 'author_id')
+    for user_id, author_id in follows.iterator():
+        backfill(user_id, author_id)
+    return TimelineEntry.objects.count()
+
+
+class TimelinePaginator(CursorPaginator):
+    """Курсорная пагинация ленты подписок.
+
+    Окно собирается из двух диапазонов: входящей ленты пользователя и
+    постов «знаменитостей», на которых он подписан. Ключи сливаются,
+    дубликаты (автор стал знаменитостью после рассылки) отбрасываются.
+    """
+
+    def __init__(self, object_list, per_page, user, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.user = user
+
+    def get_pulled_authors(self):
+        celebrity_ids = get_celebrity_ids()
+        if not celebrity_ids:
+            return []
+        return list(
+            Follow.objects.filter(
+                user=self.user, author_id__in=celebrity_ids
+            ).values_list('author_id', flat=True)
+        )
+
+    def get_window(self, key, backwards, limit):
+        inbox = TimelineEntry.objects.filter(user=self.user)
+        rows = list(
+            keyset(inbox, key, backwards, ('pub_date', 'post_id'))
+            .values_list('pub_date', 'post_id')[:limit]
+        )
+        pulled_authors = self.get_pulled_authors()
+        if pulled_authors:
+            pulled = Post.objects.filter(author_id__in=pulled_authors)
+            rows.extend(
+                keyset(pulled, key, backwards)
+                .values_list('pub_date', 'id')[:limit]
+            )
+            rows = sorted(set(rows), reverse=not backwards)[:limit]
+        posts = self.load_posts([post_id for _, post_id in rows])
+        return [posts[post_id] for _, post_id in rows if post_id in posts]
+
+    def load_posts(self, post_ids):
+        """Посты окна по id: {id: пост}."""
+        return Post.objects.select_related('author', 'group').in_bulk(
+            post_ids)
@@ -0,0 +1,125 @@
+"""Популярные посты.
+
+Оценка хранится в индексированном столбце Post.trending_score и
+меняется понемногу: новый пост получает стартовый вес, каждый
+комментарий и просмотр страницы поста добавляют свой через F(), а
+удалённый комментарий снимает свой вес с учётом затухания. Просмотр
+засчитывается один раз на клиента за TRENDING_VIEW_WINDOW: обновление
+страницы не накручивает оценку и не пишет в основную базу. Посты,
+загруженные bulk_create, получают оценку в rebuild(). Раз в
+интервал команда decay_trending одним UPDATE умножает все ненулевые
+оценки на 2^(-интервал / TRENDING_HALF_LIFE), а совсем малые обнуляет,
+чтобы они выпали из диапазона. Страница популярного — это чтение
+первых K строк индекса (-trending_score, -id) без агрегации
+комментариев.
+"""
+import hashlib
+from datetime import timedelta
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Case, F, FloatField, Value, When
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from core import replicas
+from .models import Post
+
+NEW_POST_WEIGHT = 2.0
+COMMENT_WEIGHT = 1.0
+VIEW_WEIGHT = 0.1
+# Оценки ниже порога после затухания обнуляются.
+MIN_SCORE = 0.01
+# Старше стольких периодов полураспада пост не может быть популярным.
+HORIZON_HALF_LIVES = 30
+VIEWED_KEY = 'trending:viewed:{}:{}'
+
+
+def bump(post_id, weight):
+    Post.objects.filter(pk=post_id).update(
+        trending_score=Greatest(F('trending_score') + weight, Value(0.0)))
+
+
+def viewer(request):
+    """Кто смотрит: пользователь, сессия или адрес с user-agent."""
+    if request.user.is_authenticated:
+        return f'user:{request.user.pk}'
+    if request.session.session_key:
+        return f'session:{request.session.session_key}'
+    client = '{}|{}'.format(request.META.get('REMOTE_ADDR', ''),
+                            request.META.get('HTTP_USER_AGENT', ''))
+    return 'client:' + hashlib.md5(client.encode()).hexdigest()
+
+
+def first_view(request, post_id):
+    """Не смотрел ли клиент пост последние TRENDING_VIEW_WINDOW секунд."""
+    return cache.add(VIEWED_KEY.format(post_id, viewer(request)), True,
+                     settings.TRENDING_VIEW_WINDOW)
+
+
+def counts_views(view):
+    """Засчитывает просмотр поста, в том числе ответ 304 из conditional."""
+    @wraps(view)
+    def wrapper(request, post_id, *args, **kwargs):
+        response = view(request, post_id, *args, **kwargs)
+        if (request.method == 'GET' and response.status_code in (200, 304)
+                and first_view(request, post_id)):
+            # Просмотр не повод читать следующие страницы из default.
+            with replicas.unpinned():
+                bump(post_id, VIEW_WEIGHT)
+        return response
+    return wrapper
+
+
+def decay_factor(seconds):
+    return 0.5 ** (seconds / settings.TRENDING_HALF_LIFE)
+
+
+def age_factor(moment):
+    """Во сколько раз затух вес, добавленный в момент moment."""
+    return decay_factor((timezone.now() - moment).total_seconds())
+
+
+def comment_removed(comment):
+    bump(comment.post_id, -COMMENT_WEIGHT * age_factor(comment.created))
+
+
+def rebuild(chunk_size=1000):
+    """Оценивает посты без оценки по комментариям и возрасту.
+
+    Возвращает число постов, получивших ненулевую оценку.
+    """
+    horizon = timezone.now() - timedelta(
+        seconds=settings.TRENDING_HALF_LIFE * HORIZON_HALF_LIVES)
+    posts = Post.objects.filter(
+        trending_score=0, pub_date__gt=horizon
+    ).only('pk', 'pub_date', 'comments_count')
+    scored = []
+    for post in posts.iterator(chunk_size):
+        score = ((NEW_POST_WEIGHT + COMMENT_WEIGHT * post.comments_count)
+                 * age_factor(post.pub_date))
+        if score >= MIN_SCORE:
+            post.trending_score = score
+            scored.append(post)
+    Post.objects.bulk_update(scored, ['trending_score'],
+                             batch_size=chunk_size)
+    return len(scored)
+
+
+def decay(seconds):
+    """Состаривает все оценки на seconds, возвращает число постов."""
+    factor = decay_factor(seconds)
+    return Post.objects.filter(trending_score__gt=0).update(
+        trending_score=Case(
+            When(trending_score__lt=MIN_SCORE / factor, then=Value(0.0)),
+            default=F('trending_score') * factor,
+            output_field=FloatField(),
+        )
+    )
+
+
+def top(limit):
+    return (Post.objects.filter(trending_score__gt=0)
+            .select_related('author', 'group')
+            .order_by('-trending_score', '-id')[:limit])
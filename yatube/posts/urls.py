@@ -1,12 +1,15 @@
 from django.urls import path
 
-from . import views
+from . import api, syndication, views
 
 app_name = 'posts'
 urlpatterns = [path('', views.index, name='index'),
+               path('group/', views.group_index, name='group_index'),
                path('group/<slug:slug>/',
                     views.group_list, name='group_list'),
                path('profile/<str:username>/', views.profile, name='profile'),
+               path('search/', views.search, name='search'),
+               path('popular/', views.popular, name='popular'),
                path('posts/<int:post_id>/',
                     views.post_detail, name='post_detail'),
                path("create/", views.create_post, name="create_post"),
@@ -14,9 +17,33 @@ urlpatterns = [path('', views.index, name='index'),
                     views.post_edit, name="post_edit"),
                path('posts/<int:post_id>/comment/',
                     views.add_comment, name='add_comment'),
+               path('posts/<int:post_id>/comments/',
+                    views.post_comments, name='post_comments'),
                path("follow/", views.follow_index, name="follow_index"),
                path("profile/<str:username>/follow/",
                     views.profile_follow, name="profile_follow"),
                path("profile/<str:username>/unfollow/",
                     views.profile_unfollow, name="profile_unfollow"),
+               path('profile/<str:username>/export/',
+                    views.profile_export, name='profile_export'),
+               path('group/<slug:slug>/export/',
+                    views.group_export, name='group_export'),
+               path('feeds/rss/', syndication.index_rss, name='index_rss'),
+               path('feeds/atom/', syndication.index_atom, name='index_atom'),
+               path('group/<slug:slug>/rss/',
+                    syndication.group_rss, name='group_rss'),
+               path('group/<slug:slug>/atom/',
+                    syndication.group_atom, name='group_atom'),
+               path('profile/<str:username>/rss/',
+                    syndication.profile_rss, name='profile_rss'),
+               path('profile/<str:username>/atom/',
+                    syndication.profile_atom, name='profile_atom'),
+               path('api/posts/', api.index, name='api_index'),
+               path('api/group/<slug:slug>/',
+                    api.group_list, name='api_group_list'),
+               path('api/profile/<str:username>/',
+                    api.profile, name='api_profile'),
+               path('api/posts/<int:post_id>/',
+                    api.post_detail, name='api_post_detail'),
+               path('api/follow/', api.follow_index, name='api_follow_index'),
                ]
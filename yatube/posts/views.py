@@ -1,64 +1,128 @@
 
 from django.contrib.auth.decorators import login_required
-from django.core.paginator import Paginator
+from django.core.exceptions import PermissionDenied
+from django.http import HttpResponseBadRequest
 from django.shortcuts import render, get_object_or_404, redirect
 
+from core.replicas import replica_reads
+
+from . import (directory, export, feed_cache, follow_graph,
+               recommendations, trending)
+from .conditional import (conditional, group_state, index_state,
+                          post_state, profile_state)
+from .counters import get_stats
 from .forms import PostForm, CommentForm
 from .models import Post, Group, User, Comment, Follow
+from .paginators import CURSOR_PARAM, CommentPaginator, paginate
+from .search import SearchPaginator, search_queryset
+from .timeline import TimelinePaginator
 
 NUMBER_OF_POSTS: int = 10
+COMMENTS_PER_PAGE: int = 20
+RECOMMENDATIONS_SHOWN: int = 5
+EXPORT_FORMAT_PARAM = 'format'
 
 
+@replica_reads
+@conditional(index_state)
 def index(request):
     posts = Post.objects.select_related('group', 'author').all()
     template = 'posts/index.html'
-    paginator = Paginator(posts, NUMBER_OF_POSTS)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
     title = 'Последние обновления на сайте'
     context = {
         'title': title,
-        'page_obj': page_obj,
+        **feed_cache.get_page_context(
+            request, feed_cache.INDEX_FEED, posts, NUMBER_OF_POSTS),
+    }
+    return render(request, template, context)
+
+
+@replica_reads
+def group_index(request):
+    template = 'posts/group_index.html'
+    context = {
+        'title': 'Группы',
+        'groups': directory.get_groups(),
     }
     return render(request, template, context)
 
 
+@replica_reads
+@conditional(group_state)
 def group_list(request, slug):
     group = get_object_or_404(Group, slug=slug)
     template = 'posts/group_list.html'
-    posts = group.posts.all()
-    paginator = Paginator(posts, NUMBER_OF_POSTS)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    posts = group.posts.select_related('author', 'group')
     context = {
         'group': group,
-        'page_obj': page_obj,
+        **feed_cache.get_page_context(
+            request, feed_cache.group_feed(group.id), posts,
+            NUMBER_OF_POSTS),
     }
     return render(request, template, context)
 
 
+@replica_reads
+@conditional(profile_state)
 def profile(request, username):
-    author = get_object_or_404(User, username=username)
+    author = get_object_or_404(
+        User.objects.select_related('stats'), username=username)
     template = 'posts/profile.html'
-    post_list = author.posts.all()
-    paginator = Paginator(post_list, NUMBER_OF_POSTS)
-    page_number = request.GET.get("page")
-    page_obj = paginator.get_page(page_number)
-    following = author.following.exists()
+    post_list = author.posts.select_related('group')
     context = {
         "author": author,
-        "page_obj": page_obj,
-        "following": following,
+        "stats": get_stats(author),
+        "following": follow_graph.is_following(request.user, author.id),
+        **feed_cache.get_page_context(
+            request, feed_cache.profile_feed(author.id), post_list,
+            NUMBER_OF_POSTS),
     }
     return render(request, template, context)
 
 
+@replica_reads
+def popular(request):
+    template = 'posts/popular.html'
+    context = {
+        'title': 'Популярное',
+        'posts': trending.top(NUMBER_OF_POSTS),
+    }
+    return render(request, template, context)
+
+
+def search(request):
+    template = 'posts/search.html'
+    query = request.GET.get('q', '').strip()
+    context = {
+        'query': query,
+        'title': 'Поиск',
+    }
+    if query:
+        # Старых ссылок с ?page=N на поиск нет: всегда курсор по rank,
+        # иначе у результатов не будет сниппетов.
+        paginator = SearchPaginator(
+            search_queryset(query), NUMBER_OF_POSTS, query=query)
+        context['page_obj'] = paginator.get_page(
+            request.GET.get(CURSOR_PARAM))
+    return render(request, template, context)
+
+
+def get_comments_page(request, post):
+    comments = Comment.objects.filter(post=post).select_related('author')
+    paginator = CommentPaginator(comments, COMMENTS_PER_PAGE)
+    return paginator.get_page(request.GET.get(CURSOR_PARAM))
+
+
+@replica_reads
+@trending.counts_views
+@conditional(post_state)
 def post_detail(request, post_id):
     template = "posts/post_detail.html"
     form = CommentForm(request.POST or None)
-    post = get_object_or_404(Post, id=post_id)
-    comments = Comment.objects.filter(post=post)
-    post_count = post.author.posts.count()
+    post = get_object_or_404(
+        Post.objects.select_related('author__stats', 'group'), id=post_id)
+    comments = get_comments_page(request, post)
+    post_count = get_stats(post.author).posts_count
     context = {
         "post": post,
         "post_count": post_count,
@@ -68,9 +132,20 @@ def post_detail(request, post_id):
     return render(request, template, context)
 
 
+@replica_reads
+def post_comments(request, post_id):
+    template = 'includes/comment_list.html'
+    post = get_object_or_404(Post.objects.only('id'), id=post_id)
+    context = {
+        'post': post,
+        'comments': get_comments_page(request, post),
+    }
+    return render(request, template, context)
+
+
 @login_required(login_url="users:login")
 def create_post(request):
-    form = PostForm(request.POST or None)
+    form = PostForm(request.POST or None, files=request.FILES or None)
     template = "posts/create_post.html"
     if request.method == 'POST':
         if form.is_valid():
@@ -107,7 +182,7 @@ def post_edit(request, post_id):
 @login_required
 def add_comment(request, post_id):
     post = get_object_or_404(Post, id=post_id)
-    form = CommentForm(request.POST or None)
+    form = CommentForm(request.POST or None, files=request.FILES or None)
     if form.is_valid():
         comment = form.save(commit=False)
         comment.author = request.user
@@ -116,19 +191,21 @@ def add_comment(request, post_id):
     return redirect("posts:post_detail", post_id=post_id)
 
 
+@replica_reads
 @login_required
 def follow_index(request):
     follower = Follow.objects.filter(user=request.user).values_list(
         "author_id", flat=True
     )
     posts = Post.objects.filter(author_id__in=follower)
-    paginator = Paginator(posts, NUMBER_OF_POSTS)
     template = "posts/follow.html"
-    page_number = request.GET.get("page")
-    page_obj = paginator.get_page(page_number)
+    page_obj = paginate(request, posts, NUMBER_OF_POSTS,
+                        TimelinePaginator, user=request.user)
     context = {
         "page_obj": page_obj,
         "title": "Ваши подписки",
+        "recommendations": recommendations.for_user(
+            request.user, RECOMMENDATIONS_SHOWN),
     }
     return render(request, template, context)
 
@@ -146,3 +223,26 @@ def profile_unfollow(request, username):
     author = get_object_or_404(User, username=username)
     Follow.objects.get(user=request.user, author=author).delete()
     return redirect("posts:follow_index")
+
+
+def export_posts(request, posts, filename):
+    export_format = request.GET.get(EXPORT_FORMAT_PARAM, 'csv')
+    if export_format not in export.FORMATS:
+        return HttpResponseBadRequest('Неизвестный формат выгрузки')
+    return export.streaming_response(posts, export_format, filename)
+
+
+@login_required
+def profile_export(request, username):
+    author = get_object_or_404(User, username=username)
+    if author != request.user and not request.user.is_staff:
+        raise PermissionDenied
+    return export_posts(request, author.posts.all(), author.username)
+
+
+@login_required
+def group_export(request, slug):
+    group = get_object_or_404(Group, slug=slug)
+    if not request.user.is_staff:
+        raise PermissionDenied
+    return export_posts(request, group.posts.all(), f'group-{group.slug}')
@@ -1,4 +1,5 @@
 
+
 import os
 
 # Build paths inside the project like this: os.path.join(BASE_DIR, ...)
@@ -40,10 +41,12 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.ServerTimingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
+    'core.replicas.ReplicaPinMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
@@ -53,7 +56,7 @@ ROOT_URLCONF = 'yatube.urls'
 TEMPLATES_DIR = os.path.join(BASE_DIR, 'templates')
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': 'core.template_backend.DjangoTemplates',
         'DIRS': [TEMPLATES_DIR],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -78,8 +81,15 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
-    }
+    },
+    # Снимок default, обновляется командой snapshot_replicas.
+    'replica': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.path.join(BASE_DIR, 'db.replica.sqlite3'),
+        'TEST': {'MIRROR': 'default'},
+    },
 }
+DATABASE_ROUTERS = ['core.replicas.ReplicaRouter']
 
 
 # Password validation
@@ -127,8 +137,59 @@ LOGIN_REDIRECT_URL = 'posts:index'
 CSRF_FAILURE_VIEW = 'core.views.csrf_failure'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+# Кеш в файле SQLite общий для всех воркеров: истёкший горячий ключ
+# пересчитывает один процесс, остальные отдают устаревшее значение.
 CACHES = {
     'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'BACKEND': 'core.cache.SQLiteCache',
+        'LOCATION': os.path.join(BASE_DIR, 'cache.sqlite3'),
+        'OPTIONS': {
+            'STALE_TIMEOUT': 60 * 5,
+            'LOCK_TIMEOUT': 30,
+            # Страницы лент живут часами, 300 записей по умолчанию мало.
+            'MAX_ENTRIES': 100000,
+        },
     }
 }
+# Тесты чистят кеш в setUp, поэтому раннер даёт им свой файл кеша.
+TEST_RUNNER = 'core.test_runner.TestRunner'
+# Авторы, у которых подписчиков больше лимита, не рассылают посты по
+# лентам подписчиков: их посты подмешиваются в ленту при чтении.
+TIMELINE_FANOUT_LIMIT = 5000
+TIMELINE_BATCH_SIZE = 1000
+TIMELINE_CELEBRITIES_TIMEOUT = 60 * 10
+# Страницы лент сбрасываются сменой поколения при записи постов,
+# поэтому TTL может быть долгим.
+FEED_CACHE_TIMEOUT = 60 * 60 * 3
+# Множество подписок пользователя сбрасывается при подписке и отписке.
+FOLLOW_GRAPH_TIMEOUT = 60 * 60
+# Ленты и страницы постов читаются с реплик, для которых уже снят
+# снимок. После записи клиент REPLICA_PIN_SECONDS читает только default,
+# поэтому закрепление должно быть не короче интервала снимков.
+DATABASE_REPLICAS = ['replica']
+REPLICA_APPS = ['posts']
+REPLICA_PIN_SECONDS = 60 * 5
+# За это время (в секундах) оценка популярности поста падает вдвое.
+TRENDING_HALF_LIFE = 60 * 60 * 6
+# Повторные просмотры поста одним клиентом за это время не засчитываются.
+TRENDING_VIEW_WINDOW = 60 * 60
+# Процессы для фоновой нарезки миниатюр; 0 — нарезать сразу в запросе.
+THUMBNAIL_WORKERS = 2
+# Загрузки картинок: больше лимитов отклоняются до декодирования, прочие
+# ужимаются до IMAGE_MAX_SIZE по длинной стороне и перекодируются.
+IMAGE_MAX_UPLOAD_SIZE = 20 * 1024 * 1024
+IMAGE_MAX_PIXELS = 50 * 1000 * 1000
+IMAGE_MAX_SIZE = 1920
+# Заголовок Server-Timing и строка лога core.timing с разбивкой времени
+# каждого запроса на SQL, шаблоны и миниатюры.
+SERVER_TIMING = False
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'core.timing': {'handlers': ['console'], 'level': 'INFO'},
+    },
+}
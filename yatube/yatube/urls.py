@@ -26,7 +26,7 @@ urlpatterns = [
     path('about/', include('about.urls', namespace='about')),
 ]
 handler404 = 'core.views.page_not_found'
-handler403 = 'core.views.csrf_failure'
+handler403 = 'core.views.permission_denied'
 if settings.DEBUG:
     urlpatterns += static(
         settings.MEDIA_URL, document_root=settings.MEDIA_ROOT